@@ -0,0 +1,167 @@
+import pandas as pd
+import os
+from Techblitz.PdfTables import pdf_extractor
+
+REQUIRED_COLUMNS = [
+    'Date', 'Inflation_Rate', 'Interest_Rate',
+    'Revenue_Growth', 'Profit_Margin', 'Cash_Flow'
+]
+NUMERIC_COLUMNS = REQUIRED_COLUMNS[1:]
+
+# Parser for CSV uploads: 'c' or 'pyarrow' (used when installed)
+CSV_ENGINE = os.getenv('CSV_ENGINE', 'c')
+# Uploads larger than this many bytes are parsed in chunks of CSV_CHUNK_ROWS rows
+CSV_CHUNK_THRESHOLD = 4 * 1024 * 1024
+CSV_CHUNK_ROWS = 100000
+
+def _pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _source_size(source):
+    """Size in bytes of a path or seekable stream, or None if unknown"""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    try:
+        position = source.tell()
+        source.seek(0, os.SEEK_END)
+        size = source.tell() - position
+        source.seek(position)
+        return size
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def _check_columns(data):
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in data.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
+
+def _check_values(data):
+    if data[NUMERIC_COLUMNS].isna().to_numpy().any():
+        raise ValueError("Dataset contains missing values")
+
+def read_csv_upload(source, engine=None, chunksize=None):
+    """
+    Parse a CSV upload straight from a path or file-like object
+
+    Only the required columns are read, with numeric columns parsed as
+    float64 up front instead of coerced afterwards. Large inputs are read
+    in chunks and validated as they arrive, so a bad file fails early.
+
+    Args:
+        source (str or file-like): Path or stream (e.g. the request's upload stream)
+        engine (str): 'c' or 'pyarrow' (defaults to CSV_ENGINE)
+        chunksize (int): Rows per chunk; chosen from the input size if None
+
+    Returns:
+        pd.DataFrame: Required columns, validated
+    """
+    engine = engine or CSV_ENGINE
+    if engine == 'pyarrow' and not _pyarrow_available():
+        engine = 'c'
+
+    if chunksize is None and engine != 'pyarrow':
+        size = _source_size(source)
+        if size is not None and size > CSV_CHUNK_THRESHOLD:
+            chunksize = CSV_CHUNK_ROWS
+
+    options = {
+        'dtype': {col: 'float64' for col in NUMERIC_COLUMNS},
+        'engine': engine
+    }
+    if engine == 'pyarrow':
+        options['usecols'] = None
+    else:
+        options['usecols'] = lambda col: col in REQUIRED_COLUMNS
+
+    try:
+        if chunksize:
+            chunks = []
+            for chunk in pd.read_csv(source, chunksize=chunksize, **options):
+                _check_columns(chunk)
+                _check_values(chunk)
+                chunks.append(chunk)
+            if not chunks:
+                raise ValueError("Empty dataset")
+            data = pd.concat(chunks, ignore_index=True)
+        else:
+            data = pd.read_csv(source, **options)
+            _check_columns(data)
+            _check_values(data)
+    except (TypeError, pd.errors.ParserError) as e:
+        raise ValueError(f"Invalid CSV data: {str(e)}")
+
+    return data[REQUIRED_COLUMNS]
+
+def read_pdf_upload(source):
+    """Extract the first table with the required columns and coerce its numeric columns"""
+    data = pdf_extractor.extract(source, REQUIRED_COLUMNS)
+
+    _check_columns(data)
+    data = data[REQUIRED_COLUMNS].copy()
+    data[NUMERIC_COLUMNS] = data[NUMERIC_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    _check_values(data)
+    return data
+
+def load_financial_data(source, filename=None):
+    """
+    Load and validate an uploaded financial dataset
+
+    Args:
+        source (str or file-like): Path or stream holding the upload
+        filename (str): Original file name, used to pick the parser
+            (defaults to source when it is a path)
+
+    Returns:
+        pd.DataFrame: Numeric required columns indexed by Date
+    """
+    filename = filename or (source if isinstance(source, str) else '')
+    if filename.lower().endswith('.pdf'):
+        data = read_pdf_upload(source)
+    else:
+        data = read_csv_upload(source)
+
+    data['Date'] = pd.to_datetime(data['Date'])
+    return data.set_index('Date')
+
+def load_batch_data(source, targets, entity_column='Entity', engine=None):
+    """
+    Load a long-format CSV with one row per (entity, date)
+
+    Args:
+        source (str or file-like): Path or stream holding the upload
+        targets (list): Target columns to read as float64
+        entity_column (str): Column identifying each series
+        engine (str): 'c' or 'pyarrow' (defaults to CSV_ENGINE)
+
+    Returns:
+        pd.DataFrame: Entity and target columns indexed by Date
+    """
+    engine = engine or CSV_ENGINE
+    if engine == 'pyarrow' and not _pyarrow_available():
+        engine = 'c'
+    columns = ['Date', entity_column] + list(targets)
+
+    try:
+        data = pd.read_csv(
+            source,
+            engine=engine,
+            usecols=None if engine == 'pyarrow' else (lambda col: col in columns),
+            dtype={**{t: 'float64' for t in targets}, entity_column: 'str'}
+        )
+    except (TypeError, pd.errors.ParserError) as e:
+        raise ValueError(f"Invalid CSV data: {str(e)}")
+
+    missing_cols = [col for col in columns if col not in data.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
+    data = data[columns]
+    if data.isna().to_numpy().any():
+        raise ValueError("Dataset contains missing values")
+
+    data[entity_column] = data[entity_column].astype('category')
+    data['Date'] = pd.to_datetime(data['Date'])
+    return data.set_index('Date')
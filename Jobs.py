@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+class JobQueue:
+    """
+    Bounded in-process job queue served by a fixed pool of worker threads
+
+    submit() never blocks: once max_queue jobs are waiting it raises
+    QueueFullError so the caller can push back on the client. Finished jobs
+    are kept for result_ttl seconds (at most max_finished of them) for
+    status polling.
+    """
+
+    def __init__(self, workers=2, max_queue=16, result_ttl=3600, max_finished=1000):
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        for i in range(workers):
+            worker = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and return its job ID"""
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        with self._lock:
+            self._expire()
+            self._jobs[job_id] = job
+        try:
+            self._queue.put_nowait((job_id, func, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job_id]
+            raise QueueFullError("Job queue is full")
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if unknown or expired"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def depth(self):
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            job_id, func, args, kwargs = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is None:
+                self._queue.task_done()
+                continue
+            with self._lock:
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                with self._lock:
+                    job['status'] = 'failed'
+                    job['error'] = str(e)
+                    job['finished_at'] = time.time()
+            else:
+                with self._lock:
+                    job['status'] = 'done'
+                    job['result'] = result
+                    job['finished_at'] = time.time()
+            finally:
+                self._queue.task_done()
+
+    def _expire(self):
+        """Drop finished jobs past their TTL or beyond max_finished (caller holds the lock)"""
+        now = time.time()
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished_at'] is not None
+        ]
+        excess = len(finished) - self.max_finished
+        for job_id in finished:
+            job = self._jobs[job_id]
+            if excess > 0 or now - job['finished_at'] > self.result_ttl:
+                del self._jobs[job_id]
+                excess -= 1
@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds (s) of the latency histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_NAME_PATTERN = re.compile(r'[^A-Za-z0-9_]')
+
+def _label_string(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        f'{key}="{str(value)}"'.replace('\n', ' ') for key, value in sorted(labels)
+    )
+    return '{' + pairs + '}'
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered in Prometheus text format"""
+
+    def __init__(self, prefix='techblitz'):
+        self.prefix = prefix
+        self._histograms = {}
+        self._counters = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, help_text='', **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name, amount=1, help_text='', **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._help.setdefault(name, help_text)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def render(self):
+        """Prometheus exposition text for every metric"""
+        lines = []
+        with self._lock:
+            for kind, store in (('counter', self._counters), ('histogram', self._histograms)):
+                seen = set()
+                for (name, labels), value in sorted(store.items()):
+                    full_name = f'{self.prefix}_{name}'
+                    if name not in seen:
+                        seen.add(name)
+                        if self._help.get(name):
+                            lines.append(f'# HELP {full_name} {self._help[name]}')
+                        lines.append(f'# TYPE {full_name} {kind}')
+                    if kind == 'counter':
+                        lines.append(f'{full_name}{_label_string(labels)} {value}')
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + ('+Inf',), value.counts):
+                        cumulative += count
+                        bucket_labels = _label_string(labels + (('le', bound),))
+                        lines.append(f'{full_name}_bucket{bucket_labels} {cumulative}')
+                    lines.append(f'{full_name}_sum{_label_string(labels)} {value.total}')
+                    lines.append(f'{full_name}_count{_label_string(labels)} {value.count}')
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+def _request_timings():
+    """Per-request stage list, or None outside a Flask request"""
+    from flask import g, has_request_context
+    if not has_request_context():
+        return None
+    if not hasattr(g, 'stage_timings'):
+        g.stage_timings = []
+    return g.stage_timings
+
+def record_stage(stage, seconds, **labels):
+    """Record a stage duration in the histograms and, inside a request, its Server-Timing header"""
+    registry.observe('stage_duration_seconds', seconds,
+                     help_text='Duration of pipeline stages', stage=stage, **labels)
+    timings = _request_timings()
+    if timings is not None:
+        timings.append(('_'.join([stage] + [str(v) for v in labels.values()]), seconds))
+
+@contextmanager
+def stage(name, **labels):
+    """Time the enclosed block as a named stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start, **labels)
+
+def init_app(app, service):
+    """Add Server-Timing headers, request histograms and a /metrics endpoint to a Flask app"""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _finish_timer(response):
+        started = getattr(g, 'request_started', None)
+        if started is None:
+            return response
+        total = time.perf_counter() - started
+        registry.observe('request_duration_seconds', total,
+                         help_text='HTTP request latency',
+                         service=service, endpoint=request.endpoint or 'unknown',
+                         method=request.method, status=response.status_code)
+        timings = getattr(g, 'stage_timings', [])
+        entries = [
+            f'{_NAME_PATTERN.sub("_", name)};dur={seconds * 1000:.1f}' for name, seconds in timings
+        ]
+        entries.append(f'total;dur={total * 1000:.1f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
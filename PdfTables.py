@@ -0,0 +1,128 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import io
+
+# Pages scanned before giving up on finding a table with the required columns
+MAX_PDF_PAGES = 50
+# Extracted tables kept in memory, keyed by PDF content hash
+PDF_CACHE_SIZE = 64
+
+def _blank_pdf():
+    """Smallest valid one-page PDF, used to start the JVM ahead of the first upload"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 72 72] >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objects) + 1, xref))
+    return out.getvalue()
+
+def _tabula():
+    # Imported on first use: tabula (and its Java bridge) is only needed for PDF uploads
+    import tabula
+    return tabula
+
+class PdfTableExtractor:
+    """
+    Long-lived tabula extraction service
+
+    Uses tabula's in-process JVM (jpype) rather than a java subprocess per
+    call, so the JVM starts once and stays warm. Pages are scanned one at a
+    time and extraction stops at the first table carrying the required
+    columns. Results are cached by PDF content hash.
+    """
+
+    def __init__(self, max_pages=MAX_PDF_PAGES, cache_size=PDF_CACHE_SIZE):
+        self.max_pages = max_pages
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # One extraction at a time through the shared JVM
+        self._jvm_lock = threading.Lock()
+        self._warm = False
+
+    def warm_up(self):
+        """Start the JVM now instead of on the first PDF request"""
+        if self._warm:
+            return
+        try:
+            with self._jvm_lock:
+                _tabula().read_pdf(io.BytesIO(_blank_pdf()), pages=1, force_subprocess=False)
+            self._warm = True
+        except Exception as e:
+            print(f"❌ Error warming up PDF extraction: {str(e)}")
+
+    def _read_page(self, pdf_bytes, page):
+        with self._jvm_lock:
+            return _tabula().read_pdf(io.BytesIO(pdf_bytes), pages=page, force_subprocess=False)
+
+    def extract(self, source, required_columns=None):
+        """
+        Return the first table in a PDF that has all required columns
+
+        Args:
+            source (bytes, str or file-like): PDF content, path or stream
+            required_columns (list): Columns the table must contain; the
+                first table found is returned if None
+
+        Returns:
+            pd.DataFrame: Copy of the extracted table
+        """
+        if isinstance(source, bytes):
+            pdf_bytes = source
+        elif isinstance(source, str):
+            with open(source, 'rb') as f:
+                pdf_bytes = f.read()
+        else:
+            pdf_bytes = source.read()
+
+        key = (hashlib.sha256(pdf_bytes).hexdigest(), tuple(required_columns or ()))
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key].copy()
+
+        table = None
+        first_table = None
+        for page in range(1, self.max_pages + 1):
+            try:
+                tables = self._read_page(pdf_bytes, page)
+            except Exception:
+                # Reading past the last page raises; anything on page 1 is a real error
+                if page == 1:
+                    raise
+                break
+            for candidate in tables:
+                if first_table is None:
+                    first_table = candidate
+                if not required_columns or all(c in candidate.columns for c in required_columns):
+                    table = candidate
+                    break
+            if table is not None:
+                break
+
+        if table is None:
+            if first_table is None:
+                raise ValueError("No tables found in PDF")
+            # No table matched; hand back the first one so callers report the missing columns
+            table = first_table
+
+        with self._cache_lock:
+            self._cache[key] = table
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return table.copy()
+
+pdf_extractor = PdfTableExtractor()
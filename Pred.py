@@ -1,119 +1,229 @@
-from flask import Flask, request, jsonify, Blueprint
-from werkzeug.utils import secure_filename
-import pandas as pd
-import matplotlib.pyplot as plt
-from datetime import datetime
-import os
-from tabula.io import read_pdf
-from Techblitz.Visual.Arima import train_all_metrics
-from Techblitz.Visual.Postvisual import (
-    adjust_predictions, 
-    format_predictions, 
-    visualize_predictions
-)
+from Techblitz.Startup import init_app as init_startup, lazy_import, preload, timed
+with timed('import:core'):
+    from flask import Flask, request, jsonify, Blueprint, Response, send_file
+    import pandas as pd
+    import numpy as np
+    from datetime import datetime
+    import os
+    import io
+    import json
+    import sys
+    from contextlib import nullcontext
+    import threading
+    import uuid
+    from Techblitz.Ingest import load_batch_data, load_financial_data
+    from Techblitz.Jobs import JobQueue, QueueFullError
+    from Techblitz.Metrics import init_app as init_metrics, record_stage, registry, stage
+    from Techblitz.PdfTables import pdf_extractor
+    from Techblitz.Results import results_store
+    from Techblitz.Visual.ModelCache import ModelCache, model_cache_key
+
+# Forecasting (statsmodels, sklearn), charts (matplotlib, seaborn) and batch output are
+# imported on first use, so the app starts without them; PRELOAD loads them up front
+def _lazy(module_name):
+    """lazy_import, recording a first import as its own 'import' stage"""
+    cold = module_name not in sys.modules
+    with stage('import', module=module_name.rsplit('.', 1)[-1]) if cold else nullcontext():
+        return lazy_import(module_name)
+
+def _arima():
+    return _lazy('Techblitz.Visual.Arima')
+
+def _charts():
+    return _lazy('Techblitz.Visual.Postvisual')
+
+def _render():
+    return _lazy('Techblitz.Visual.Render')
 
 # Initialize Flask app and Blueprint
 app = Flask(__name__)
 analysis = Blueprint("analysis", __name__, url_prefix="/api")
 
 # Configure upload settings
-UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'csv'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_SCENARIOS'] = 100000
+
+# ARIMA training: 'serial', 'threads' or 'processes', with an optional timeout (s) shared by all targets
+app.config['ARIMA_TRAINING_MODE'] = os.getenv('ARIMA_TRAINING_MODE', 'serial')
+app.config['ARIMA_TARGET_TIMEOUT'] = None
+# ARIMA order: a fixed (p, d, q) tuple, or 'auto' to search one per target
+app.config['ARIMA_ORDER'] = 'auto' if os.getenv('ARIMA_ORDER') == 'auto' else (1, 1, 1)
+
+# Async analysis jobs: worker threads, queue depth limit and result retention (s)
+app.config['JOB_WORKERS'] = int(os.getenv('JOB_WORKERS', 2))
+app.config['JOB_QUEUE_DEPTH'] = int(os.getenv('JOB_QUEUE_DEPTH', 16))
+app.config['JOB_RESULT_TTL'] = 3600
+
+# Fitted models for repeat uploads, optionally persisted under MODEL_CACHE_DIR
+with timed('init:model_cache'):
+    model_cache = ModelCache(
+        max_entries=32,
+        max_bytes=256 * 1024 * 1024,
+        disk_dir=os.getenv('MODEL_CACHE_DIR')
+    )
+
+# Start tabula's JVM in the background so the first PDF upload doesn't pay for it. This
+# waits for the first request: a JVM started before a preloading server forks is unusable
+app.config['PDF_WARM_UP'] = os.getenv('PDF_WARM_UP', '1') == '1'
+_pdf_warm_up_started = threading.Event()
+
+@app.before_request
+def _start_pdf_warm_up():
+    if app.config['PDF_WARM_UP'] and not _pdf_warm_up_started.is_set():
+        _pdf_warm_up_started.set()
+        threading.Thread(target=pdf_extractor.warm_up, daemon=True).start()
+
+# Persistent model store: set MODEL_STORE_DIR to update stored models as new periods arrive
+model_store = None
+if os.getenv('MODEL_STORE_DIR'):
+    with timed('init:model_store'):
+        model_store = lazy_import('Techblitz.Visual.ModelStore').ModelStore(os.getenv('MODEL_STORE_DIR'))
+
+with timed('init:jobs'):
+    jobs = JobQueue(
+        workers=app.config['JOB_WORKERS'],
+        max_queue=app.config['JOB_QUEUE_DEPTH'],
+        result_ttl=app.config['JOB_RESULT_TTL']
+    )
+
+# Before fork with a preloading server; see Startup.PRELOAD
+preload({
+    'statsmodels': _arima,
+    'charts': lambda: (_charts(), _render()),
+    'pdf': lambda: lazy_import('tabula'),
+    'batch': lambda: lazy_import('Techblitz.Visual.Batch')
+})
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def process_financial_data(file_path):
-    """Process uploaded financial data file"""
+def parse_user_params(form):
+    """Read and validate adjustment parameters from submitted form data"""
     try:
-        # Load data based on file type
-        if file_path.lower().endswith('.pdf'):
-            tables = read_pdf(file_path, pages='all')
-            if not tables:
-                raise ValueError("No tables found in PDF")
-            data = tables[0]
-        else:
-            data = pd.read_csv(file_path)
-
-        # Validate required columns
-        required_columns = [
-            'Date', 'Inflation_Rate', 'Interest_Rate',
-            'Revenue_Growth', 'Profit_Margin', 'Cash_Flow'
-        ]
-        
-        missing_cols = [col for col in required_columns if col not in data.columns]
-        if missing_cols:
-            raise ValueError(f"Missing columns: {', '.join(missing_cols)}")
-
-        # Process data
-        data['Date'] = pd.to_datetime(data['Date'])
-        data = data.set_index('Date')
-        
-        # Convert numeric columns
-        numeric_cols = data.columns.difference(['Date'])
-        data[numeric_cols] = data[numeric_cols].apply(pd.to_numeric, errors='coerce')
-        
-        if data.isnull().any().any():
-            raise ValueError("Dataset contains missing values")
+        user_params = pd.DataFrame([{
+            'Inflation_Rate': float(form.get('inflation_rate', 0)),
+            'Interest_Rate': float(form.get('interest_rate', 0)),
+            'Growth_Factor': float(form.get('growth_factor', 1))
+        }])
+    except ValueError:
+        raise ValueError("Invalid parameter values")
+
+    # Validate parameters
+    if not (0 <= user_params['Growth_Factor'].values[0] <= 2):
+        raise ValueError("Growth Factor must be between 0 and 2")
+    if user_params['Inflation_Rate'].values[0] < 0:
+        raise ValueError("Inflation Rate cannot be negative")
+    if user_params['Interest_Rate'].values[0] < 0:
+        raise ValueError("Interest Rate cannot be negative")
+
+    return user_params
+
+def process_financial_data(source, filename=None):
+    """Process uploaded financial data file (path or file-like object)"""
+    return jsonify(run_financial_analysis(source, request.form, filename))
+
+def run_analysis_job(payload, filename, form):
+    """Background job: run the analysis on an upload held in memory"""
+    return run_financial_analysis(io.BytesIO(payload), form, filename)
+
+def run_financial_analysis(source, form, filename=None):
+    """Run the analysis pipeline on an upload and return the response payload"""
+    try:
+        # Parse and validate the upload in one pass
+        with stage('parse'):
+            data = load_financial_data(source, filename)
 
         # Get user parameters
-        try:
-            user_params = pd.DataFrame([{
-                'Inflation_Rate': float(request.form.get('inflation_rate', 0)),
-                'Interest_Rate': float(request.form.get('interest_rate', 0)),
-                'Growth_Factor': float(request.form.get('growth_factor', 1))
-            }])
-        except ValueError:
-            raise ValueError("Invalid parameter values")
-
-        # Validate parameters
-        if not (0 <= user_params['Growth_Factor'].values[0] <= 2):
-            raise ValueError("Growth Factor must be between 0 and 2")
-        if user_params['Inflation_Rate'].values[0] < 0:
-            raise ValueError("Inflation Rate cannot be negative")
-        if user_params['Interest_Rate'].values[0] < 0:
-            raise ValueError("Interest Rate cannot be negative")
+        with stage('validation'):
+            user_params = parse_user_params(form)
 
         # Process predictions
         targets = ['Revenue_Growth', 'Profit_Margin', 'Cash_Flow']
-        results_dict = train_all_metrics(data, targets)
+        cache_key = model_cache_key(data, targets, app.config['ARIMA_ORDER'])
+        results_dict = model_cache.get(cache_key)
+        registry.increment('model_cache_requests_total', help_text='Model cache lookups',
+                           result='miss' if results_dict is None else 'hit')
+        if results_dict is None:
+            if model_store is not None:
+                results_dict = model_store.train_all_metrics(
+                    data, targets,
+                    lineage=form.get('dataset_id'),
+                    mode=app.config['ARIMA_TRAINING_MODE'],
+                    timeout=app.config['ARIMA_TARGET_TIMEOUT'],
+                    order=app.config['ARIMA_ORDER']
+                )
+            else:
+                results_dict = _arima().train_all_metrics(
+                    data, targets,
+                    mode=app.config['ARIMA_TRAINING_MODE'],
+                    timeout=app.config['ARIMA_TARGET_TIMEOUT'],
+                    order=app.config['ARIMA_ORDER']
+                )
+            failed = {t: r['error'] for t, r in results_dict.items() if 'error' in r}
+            if failed:
+                raise ValueError("Model training failed for " + "; ".join(
+                    f"{t} ({err})" for t, err in failed.items()
+                ))
+            for target, result in results_dict.items():
+                if 'fit_seconds' in result:
+                    record_stage('fit', result['fit_seconds'], target=target)
+            model_cache.put(cache_key, results_dict)
         predictions_summary = []
 
-        for target in targets:
-            original_pred = results_dict[target]['predictions'][-1]
-            adjusted_pred = adjust_predictions(
-                {target: original_pred}, 
-                user_params
-            )[target]
-            
-            prediction_info = format_predictions(
-                original_pred, 
-                adjusted_pred, 
-                target
-            )
-            predictions_summary.append(prediction_info)
+        # Resolved before the timed stages, so a cold import isn't counted as adjustment
+        charts = _charts()
+        with stage('adjustment'):
+            for target in targets:
+                original_pred = results_dict[target]['predictions'][-1]
+                adjusted_pred = charts.adjust_predictions(
+                    {target: original_pred}, 
+                    user_params
+                )[target]
+                
+                prediction_info = charts.format_predictions(
+                    original_pred, 
+                    adjusted_pred, 
+                    target
+                )
+                predictions_summary.append(prediction_info)
 
         # Generate visualizations
-        viz_files = visualize_predictions(predictions_summary)
+        with stage('render'):
+            viz_files = charts.visualize_predictions(predictions_summary)
 
-        # Save results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        results_dir = 'results'
-        if not os.path.exists(results_dir):
-            os.makedirs(results_dir)
-            
-        filename = f'{results_dir}/predictions_{timestamp}.csv'
-        pd.DataFrame(predictions_summary).to_csv(filename, index=False)
+        # Save results (queued; written in batches by the results store)
+        with stage('result_write'):
+            result_id = results_store.record(
+                'prediction', predictions_summary,
+                params={
+                    'inflation_rate': float(user_params['Inflation_Rate'].values[0]),
+                    'interest_rate': float(user_params['Interest_Rate'].values[0]),
+                    'growth_factor': float(user_params['Growth_Factor'].values[0]),
+                    'filename': filename
+                },
+                model_key=cache_key
+            )
 
-        return jsonify({
+        payload = {
             'status': 200,
             'predictions': predictions_summary,
             'visualizations': viz_files,
-            'file_saved': filename
-        })
+            'result_id': result_id,
+            'model_key': cache_key
+        }
+
+        # Optional walk-forward backtest of the fitted orders
+        if form.get('backtest') == '1':
+            payload['backtest'] = _arima().backtest_all_metrics(
+                data, targets,
+                orders={t: r['order'] for t, r in results_dict.items()},
+                horizon=int(form.get('backtest_horizon', 3)),
+                mode='processes' if app.config['ARIMA_TRAINING_MODE'] == 'processes' else 'threads'
+            )
+
+        return payload
 
     except Exception as e:
         raise ValueError(f"Data processing failed: {str(e)}")
@@ -122,10 +232,6 @@ def process_financial_data(file_path):
 def analyze_financial_data():
     """API endpoint for financial analysis"""
     try:
-        # Ensure upload directory exists
-        if not os.path.exists(app.config['UPLOAD_FOLDER']):
-            os.makedirs(app.config['UPLOAD_FOLDER'])
-
         # Validate file upload
         if 'file' not in request.files:
             return jsonify({
@@ -149,23 +255,322 @@ def analyze_financial_data():
                 'status': 400
             }), 400
 
-        # Save and process file
+        run_async = request.args.get('mode') == 'async' or request.form.get('mode') == 'async'
+
+        # Parse uploads from the request stream - nothing is written to disk
         try:
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
-            
-            return process_financial_data(file_path)
-            
+            if not run_async:
+                return process_financial_data(file.stream, file.filename)
+
+            # Reject bad parameters now rather than in a failed job
+            parse_user_params(request.form)
+            job_id = jobs.submit(
+                run_analysis_job, file.read(), file.filename, request.form.to_dict()
+            )
+            return jsonify({
+                'status': 202,
+                'job_id': job_id,
+                'status_url': f'/api/jobs/{job_id}',
+                'result_url': f'/api/jobs/{job_id}/result'
+            }), 202
+
+        except QueueFullError:
+            response = jsonify({
+                'error': 'Server busy',
+                'details': 'Too many queued analyses, retry later',
+                'status': 503
+            })
+            response.headers['Retry-After'] = '30'
+            return response, 503
         except ValueError as e:
             return jsonify({
                 'error': 'Processing failed',
                 'details': str(e),
                 'status': 400
             }), 400
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Server error',
+            'details': str(e),
+            'status': 500
+        }), 500
+
+@analysis.route("/analyze/batch", methods=["POST"])
+def analyze_batch():
+    """API endpoint forecasting every series of a long-format CSV, streamed as JSON lines"""
+    try:
+        file = request.files.get('file')
+        if file is None or not file.filename.lower().endswith('.csv'):
+            return jsonify({
+                'error': 'Invalid file',
+                'details': 'Upload a long-format CSV with key "file"',
+                'status': 400
+            }), 400
+
+        entity_column = request.form.get('entity_column', 'Entity')
+        targets = [
+            t.strip() for t in
+            request.form.get('targets', 'Revenue_Growth,Profit_Margin,Cash_Flow').split(',')
+            if t.strip()
+        ]
+
+        try:
+            data = load_batch_data(file.stream, targets, entity_column)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f'results/batch_{timestamp}_{uuid.uuid4().hex[:8]}.parquet'
+            rows = lazy_import('Techblitz.Visual.Batch').stream_batch_forecast(
+                data, targets, filename,
+                entity_column=entity_column,
+                order=app.config['ARIMA_ORDER'] if app.config['ARIMA_ORDER'] != 'auto' else (1, 1, 1),
+                mode='processes'
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': 'Processing failed',
+                'details': str(e),
+                'status': 400
+            }), 400
+
+        def generate():
+            count = 0
+            for row in rows:
+                count += 1
+                yield json.dumps(row) + '\n'
+            yield json.dumps({'status': 200, 'series': count, 'file_saved': filename}) + '\n'
+
+        return Response(generate(), mimetype='application/x-ndjson')
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Server error',
+            'details': str(e),
+            'status': 500
+        }), 500
+
+@analysis.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """API endpoint for polling an async analysis job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Unknown job',
+            'details': 'Job ID not found or result expired',
+            'status': 404
+        }), 404
+
+    return jsonify({
+        'status': 200,
+        'job_id': job_id,
+        'state': job['status'],
+        'submitted_at': job['submitted_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at'],
+        'queue_depth': jobs.depth(),
+        'error': job['error']
+    })
+
+@analysis.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    """API endpoint returning the payload of a finished analysis job"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Unknown job',
+            'details': 'Job ID not found or result expired',
+            'status': 404
+        }), 404
+
+    if job['status'] == 'failed':
+        return jsonify({
+            'error': 'Processing failed',
+            'details': job['error'],
+            'status': 400
+        }), 400
+    if job['status'] != 'done':
+        return jsonify({
+            'status': 202,
+            'job_id': job_id,
+            'state': job['status']
+        }), 202
+
+    return jsonify(job['result'])
+
+def _parse_time(value):
+    """Unix timestamp from a query-string time (Unix seconds or ISO 8601)"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@analysis.route("/results", methods=["GET"])
+def list_results():
+    """API endpoint querying stored results by ID, kind, metric, time range, model and parameters"""
+    try:
+        args = request.args
+        params = {}
+        for name in ('inflation_rate', 'interest_rate', 'growth_factor'):
+            if name in args:
+                params[name] = float(args[name])
+        rows = results_store.query(
+            kind=args.get('kind'),
+            metric=args.get('metric'),
+            since=_parse_time(args.get('since')),
+            until=_parse_time(args.get('until')),
+            params=params,
+            model_key=args.get('model_key'),
+            run_id=args.get('result_id'),
+            limit=min(int(args.get('limit', 100)), 10000)
+        )
+    except ValueError as e:
+        return jsonify({
+            'error': 'Invalid query',
+            'details': str(e),
+            'status': 400
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'error': 'Server error',
+            'details': str(e),
+            'status': 500
+        }), 500
+
+    return jsonify({'status': 200, 'count': len(rows), 'results': rows})
+
+@analysis.route("/chart-data", methods=["POST"])
+def get_chart_data():
+    """API endpoint returning statistics, trends and downsampled series as JSON for client-side charts"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({
+                'error': 'No file part in request',
+                'details': 'Include file in form data with key "file"',
+                'status': 400
+            }), 400
+
+        file = request.files['file']
+        if file.filename == '' or not allowed_file(file.filename):
+            return jsonify({
+                'error': 'Invalid file type',
+                'details': f'Allowed types: {", ".join(ALLOWED_EXTENSIONS)}',
+                'status': 400
+            }), 400
+
+        chart_data = _lazy('Techblitz.Visual.ChartData')
+        try:
+            with stage('parse'):
+                data = load_financial_data(file.stream, file.filename)
+            chart = chart_data.chart_data(
+                data,
+                points=int(request.form.get('points', chart_data.DEFAULT_POINTS)),
+                method=request.form.get('method', 'lttb')
+            )
+        except ValueError as e:
+            return jsonify({
+                'error': 'Processing failed',
+                'details': str(e),
+                'status': 400
+            }), 400
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Server error',
+            'details': str(e),
+            'status': 500
+        }), 500
+
+    return jsonify({'status': 200, **chart})
+
+@analysis.route("/charts/<handle>", methods=["GET"])
+def get_chart(handle):
+    """API endpoint serving a chart, rendering it on first fetch"""
+    try:
+        path = _render().get_renderer('visualizations').get(handle)
+    except Exception as e:
+        return jsonify({
+            'error': 'Rendering failed',
+            'details': str(e),
+            'status': 500
+        }), 500
+
+    if path is None:
+        return jsonify({
+            'error': 'Unknown chart',
+            'details': 'Chart handle not found or expired',
+            'status': 404
+        }), 404
+
+    return send_file(os.path.abspath(path), mimetype=_render().MIME_TYPES[handle.rsplit('.', 1)[-1]],
+                     max_age=86400)
+
+@analysis.route("/scenarios", methods=["POST"])
+def analyze_scenarios():
+    """API endpoint for sensitivity sweeps over previously fitted forecasts"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        model_key = payload.get('model_key')
+        results_dict = model_cache.get(model_key) if model_key else None
+        if results_dict is None:
+            return jsonify({
+                'error': 'Unknown model_key',
+                'details': 'Use the model_key returned by /api/analyze',
+                'status': 404
+            }), 404
+
+        try:
+            if 'grid' in payload:
+                grid = payload['grid']
+                inflation, interest, growth = (
+                    np.asarray(grid.get('inflation_rate', [0]), dtype=float).ravel(),
+                    np.asarray(grid.get('interest_rate', [0]), dtype=float).ravel(),
+                    np.asarray(grid.get('growth_factor', [1]), dtype=float).ravel()
+                )
+                # Size the product from the list lengths so oversized grids are never built
+                count = len(inflation) * len(interest) * len(growth)
+            else:
+                scenarios = np.asarray(payload.get('scenarios', []), dtype=float).reshape(-1, 3)
+                count = len(scenarios)
+        except (TypeError, ValueError, AttributeError):
+            return jsonify({
+                'error': 'Invalid scenarios',
+                'details': 'Send "scenarios" as [[inflation_rate, interest_rate, growth_factor], ...] '
+                           'or "grid" with lists per parameter',
+                'status': 400
+            }), 400
+
+        if count == 0 or count > app.config['MAX_SCENARIOS']:
+            return jsonify({
+                'error': 'Invalid scenario count',
+                'details': f'Send between 1 and {app.config["MAX_SCENARIOS"]} scenarios',
+                'status': 400
+            }), 400
+        if 'grid' in payload:
+            scenarios = _charts().scenario_grid(inflation, interest, growth)
+        # NaN fails every comparison below, so reject non-finite values first
+        if (not np.isfinite(scenarios).all() or
+                ((scenarios[:, 0] < 0) | (scenarios[:, 1] < 0) |
+                 (scenarios[:, 2] < 0) | (scenarios[:, 2] > 2)).any()):
+            return jsonify({
+                'error': 'Invalid parameter values',
+                'details': 'Values must be finite, rates >= 0 and growth factor between 0 and 2',
+                'status': 400
+            }), 400
+
+        forecasts = {
+            target: result['predictions'][-1] for target, result in results_dict.items()
+        }
+        sweep = _charts().adjust_scenarios(forecasts, scenarios)
+
+        return jsonify({
+            'status': 200,
+            'metrics': sweep['metrics'],
+            'original': sweep['original'].tolist(),
+            'scenarios': scenarios.tolist(),
+            'adjusted': sweep['adjusted'].round(6).tolist(),
+            'change_percent': sweep['change_percent'].round(4).tolist()
+        })
 
     except Exception as e:
         return jsonify({
@@ -176,6 +581,8 @@ def analyze_financial_data():
 
 # Register blueprint
 app.register_blueprint(analysis)
+init_metrics(app, 'analysis')
+init_startup(app)
 
 if __name__ == "__main__":
     print("\n🚀 Starting Financial Analysis API...")
@@ -186,5 +593,7 @@ if __name__ == "__main__":
     print("  • inflation_rate (float, >= 0)")
     print("  • interest_rate (float, >= 0)")
     print("  • growth_factor (float, 0-2)")
+    print("  • mode=async (optional, poll /api/jobs/<job_id>)")
+    print("  • backtest=1, backtest_horizon (optional walk-forward backtest)")
     print("=" * 50)
-    app.run(host="0.0.0.0", port=5003, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5003, debug=True)
@@ -1,36 +1,301 @@
 
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from sentence_transformers import SentenceTransformer
-import chromadb
+from vector_store import COLLECTION_NAME, VECTOR_BACKEND, VECTOR_DB_PATH, open_collection
+import hashlib
+import json
 import glob
+import queue
+import threading
+import sys
+import os
 
 
-pdf_files = glob.glob("E:/CodesML/Techblitz/Data/*.txt")# change to ur file directory path
+# Chunk IDs removed from Chroma per delete call
+DELETE_BATCH = 256
+# Chunks per encode call, batches buffered between pipeline stages, and
+# encode worker processes (0 encodes in-process)
+ENCODE_BATCH = 64
+PIPELINE_QUEUE_DEPTH = 4
+ENCODE_PROCESSES = int(os.getenv('ENCODE_PROCESSES', 0))
+# Per-file content hashes and chunk IDs from the last incremental run,
+# one manifest per backend and collection sharing a store directory
+MANIFEST_FILE = 'ingest_manifest.{backend}.{collection}.json'
 
-loaders = [PyPDFLoader(pdf) for pdf in pdf_files]
 
+def iter_documents(paths):
+    """Yield pages one at a time instead of loading the whole corpus"""
+    for path in paths:
+        loader = PyPDFLoader(path) if path.lower().endswith('.pdf') else TextLoader(path, encoding='utf-8')
+        yield from loader.lazy_load()
 
-Docs = [loader.load() for loader in loaders]
 
-all_pages = [page for doc in Docs for page in doc]
+def iter_chunks(paths):
+    """Yield (chunk_id, chunk) for every chunk of every file, page by page"""
+    for page in iter_documents(paths):
+        for chunk in split_documents([page]):
+            yield chunk_id(chunk.page_content), chunk
 
-all_documents = all_pages 
 
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=5000, chunk_overlap=0)
+def split_documents(documents):
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=5000, chunk_overlap=0)
+    return text_splitter.split_documents(documents)
 
 
-chunks = text_splitter.split_documents(all_documents)
+def chunk_id(text):
+    """Content-derived chunk ID: identical text always maps to the same ID"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
 
-text_chunk = [chunk.page_content for chunk in chunks]  
 
-res = SentenceTransformer("all-MiniLM-L6-v2")
-embeddings = res.encode(text_chunk)
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
 
-client = chromadb.PersistentClient(path='data')
+def _batches(items, size=DELETE_BATCH):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
 
 
-collection = client.get_or_create_collection('collection')
+_DONE = object()
 
-ids = [f"doc_{i}" for i in range(len(embeddings))]
\ No newline at end of file
+
+class _StageError:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(q, item, stop):
+    """Blocking put that gives up once the pipeline is being torn down"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    """Blocking get that returns _DONE once the pipeline is being torn down"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def run_pipeline(chunks, collection, model, batch_size=None, queue_depth=None, pool=None):
+    """
+    Encode and store chunks with loading, encoding and writing overlapped
+
+    A producer thread drains the chunks iterator (which does the loading and
+    splitting) into batches, an encoder thread embeds them, and the calling
+    thread upserts the results. Bounded queues between the stages cap memory
+    at roughly queue_depth * batch_size chunks, whatever the corpus size.
+
+    Args:
+        chunks: Iterator of (chunk_id, chunk) pairs
+        collection: Chroma collection to upsert into
+        model (SentenceTransformer): Encoder
+        batch_size (int): Chunks per encode call (defaults to ENCODE_BATCH)
+        queue_depth (int): Batches buffered per stage (defaults to PIPELINE_QUEUE_DEPTH)
+        pool: Optional multi-process pool from model.start_multi_process_pool()
+
+    Returns:
+        int: Number of chunks written
+    """
+    batch_size = batch_size or ENCODE_BATCH
+    queue_depth = queue_depth or PIPELINE_QUEUE_DEPTH
+    to_encode = queue.Queue(maxsize=queue_depth)
+    to_write = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            batch = []
+            for cid, chunk in chunks:
+                batch.append((cid, chunk))
+                if len(batch) >= batch_size:
+                    if not _put(to_encode, batch, stop):
+                        return
+                    batch = []
+            if batch:
+                _put(to_encode, batch, stop)
+            _put(to_encode, _DONE, stop)
+        except Exception as e:
+            _put(to_encode, _StageError(e), stop)
+
+    def encode():
+        while True:
+            item = _get(to_encode, stop)
+            if item is _DONE or isinstance(item, _StageError):
+                _put(to_write, item, stop)
+                return
+            try:
+                texts = [chunk.page_content for _, chunk in item]
+                if pool is not None:
+                    embeddings = model.encode_multi_process(texts, pool, batch_size=batch_size)
+                else:
+                    embeddings = model.encode(texts, batch_size=batch_size)
+            except Exception as e:
+                _put(to_write, _StageError(e), stop)
+                return
+            if not _put(to_write, (item, embeddings), stop):
+                return
+
+    workers = [threading.Thread(target=produce, daemon=True),
+               threading.Thread(target=encode, daemon=True)]
+    for worker in workers:
+        worker.start()
+
+    written = 0
+    try:
+        while True:
+            item = to_write.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _StageError):
+                raise item.error
+            batch, embeddings = item
+            collection.upsert(
+                ids=[cid for cid, _ in batch],
+                embeddings=embeddings.tolist(),
+                documents=[chunk.page_content for _, chunk in batch],
+                metadatas=[chunk.metadata for _, chunk in batch]
+            )
+            written += len(batch)
+    finally:
+        stop.set()
+        # Unblock stages waiting on a full or empty queue so they can exit
+        for q in (to_encode, to_write):
+            try:
+                while True:
+                    q.get_nowait()
+            except queue.Empty:
+                pass
+    return written
+
+
+def _encoder(model_name, processes):
+    """Load the model and, if requested, start its multi-process encode pool"""
+    model = SentenceTransformer(model_name)
+    pool = model.start_multi_process_pool(['cpu'] * processes) if processes else None
+    return model, pool
+
+
+def _finish_collection(collection):
+    """Rebuild the ANN index of backends that have one (the quantized store)"""
+    if hasattr(collection, 'build_index'):
+        collection.build_index()
+
+
+def embed_corpus(paths, db_path=VECTOR_DB_PATH, collection_name=COLLECTION_NAME, model_name="all-MiniLM-L6-v2",
+                 processes=None, backend=None):
+    """Stream a whole corpus through the embedding pipeline into the vector store; returns the number of chunks"""
+    collection = open_collection(db_path, collection_name, backend)
+
+    def unique_chunks():
+        # Identical chunks share an ID, so keep the first of each
+        seen = set()
+        for cid, chunk in iter_chunks(paths):
+            if cid not in seen:
+                seen.add(cid)
+                yield cid, chunk
+
+    processes = ENCODE_PROCESSES if processes is None else processes
+    model, pool = _encoder(model_name, processes)
+    try:
+        written = run_pipeline(unique_chunks(), collection, model, pool=pool)
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+    _finish_collection(collection)
+    return written
+
+
+def ingest_incremental(paths, db_path=VECTOR_DB_PATH, collection_name=COLLECTION_NAME, model_name="all-MiniLM-L6-v2",
+                       processes=None, backend=None):
+    """
+    Bring a vector store collection in line with the given files, touching only the diff
+
+    Unchanged files (same content hash as the last run) are skipped without
+    loading. Chunks of new or changed files are embedded only if their
+    content-derived ID is not stored yet, and chunks no file references any
+    more are deleted. Returns counts of what changed.
+    """
+    collection = open_collection(db_path, collection_name, backend)
+
+    manifest_path = os.path.join(db_path, MANIFEST_FILE.format(
+        backend=backend or VECTOR_BACKEND, collection=collection_name))
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    stats = {'unchanged_files': 0, 'changed_files': 0, 'removed_files': 0,
+             'added_chunks': 0, 'deleted_chunks': 0}
+    current = {os.path.abspath(path): path for path in paths}
+    new_manifest = {}
+    changed = []
+    for key, path in current.items():
+        digest = file_hash(path)
+        entry = manifest.get(key)
+        if entry and entry['hash'] == digest:
+            new_manifest[key] = entry
+            stats['unchanged_files'] += 1
+        else:
+            changed.append((key, path, digest))
+    stats['removed_files'] = len(set(manifest) - set(current))
+
+    known_ids = {chunk for entry in manifest.values() for chunk in entry['chunks']}
+
+    def pending_chunks():
+        # Runs in the pipeline's producer thread, filling in the manifest as files are split
+        queued = set()
+        for key, path, digest in changed:
+            ids = set()
+            for cid, chunk in iter_chunks([path]):
+                ids.add(cid)
+                if cid not in known_ids and cid not in queued:
+                    queued.add(cid)
+                    yield cid, chunk
+            new_manifest[key] = {'hash': digest, 'chunks': sorted(ids)}
+            stats['changed_files'] += 1
+
+    if changed:
+        processes = ENCODE_PROCESSES if processes is None else processes
+        model, pool = _encoder(model_name, processes)
+        try:
+            stats['added_chunks'] = run_pipeline(pending_chunks(), collection, model, pool=pool)
+        finally:
+            if pool is not None:
+                model.stop_multi_process_pool(pool)
+
+    live_ids = {chunk for entry in new_manifest.values() for chunk in entry['chunks']}
+    stale_ids = sorted(known_ids - live_ids)
+    for batch in _batches(stale_ids):
+        collection.delete(ids=batch)
+    stats['deleted_chunks'] = len(stale_ids)
+    if changed or stale_ids:
+        _finish_collection(collection)
+
+    # Written last, so an interrupted run is simply redone next time
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(new_manifest, f)
+    os.replace(tmp_path, manifest_path)
+    return stats
+
+
+if __name__ == "__main__":
+    pdf_files = glob.glob("E:/CodesML/Techblitz/Data/*.txt")# change to ur file directory path
+    if '--full' in sys.argv:
+        embed_corpus(pdf_files)
+    else:
+        print(ingest_incremental(pdf_files))
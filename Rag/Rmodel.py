@@ -1,5 +1,10 @@
-from flask import Flask, request, jsonify, Blueprint
-from retrieve import generate_response, finance_keywords
+from flask import Flask, request, jsonify, Blueprint, Response, stream_with_context
+import json
+import uuid
+from retrieve import generate_response, stream_response, llm_saturated, finance_keywords
+from Techblitz.Jobs import QueueFullError
+from Techblitz.Metrics import init_app as init_metrics
+from Techblitz.Startup import init_app as init_startup
 
 app = Flask(__name__)
 
@@ -10,11 +15,80 @@ def chatbot_route():
   
     data = request.json
     prompt = data.get("prompt")
-    result = generate_response(prompt)
+    # Conversations are kept per client; new clients get an ID to send back
+    session_id = data.get("session_id") or request.headers.get("X-Session-ID") or uuid.uuid4().hex
+
+    # Streaming is opt-in: "stream": "sse" / "ndjson" (or true), or an SSE Accept header
+    stream = data.get("stream")
+    if stream is None and "text/event-stream" in request.headers.get("Accept", ""):
+        stream = "sse"
+    if stream:
+        # Errors inside a stream can only be reported in-band, so turn callers away up front
+        if llm_saturated():
+            return busy_response()
+        response = stream_answer(prompt, data.get("filters"), session_id,
+                                 "ndjson" if stream == "ndjson" else "sse")
+        response.headers["X-Session-ID"] = session_id
+        return response
+
+    try:
+        result = generate_response(prompt, where=data.get("filters"), session_id=session_id)
+    except QueueFullError:
+        return busy_response()
+    except TimeoutError as e:
+        return jsonify({
+            "error": "Timed out",
+            "details": str(e),
+            "status": 504
+        }), 504
     
-    return jsonify("Answer :", result)
+    response = jsonify("Answer :", result)
+    response.headers["X-Session-ID"] = session_id
+    return response
+
+def busy_response():
+    """503 telling the client to retry once the model gateway has room"""
+    response = jsonify({
+        "error": "Server busy",
+        "details": "Too many questions waiting for an answer, retry later",
+        "status": 503
+    })
+    response.headers["Retry-After"] = "5"
+    return response, 503
+
+def stream_answer(prompt, filters, session_id, fmt):
+    """Stream answer tokens as server-sent events or JSON lines, ending with a done message"""
+
+    def encode(payload, event=None):
+        if fmt == "ndjson":
+            return json.dumps(payload) + "\n"
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+    def generate():
+        try:
+            for token in stream_response(prompt, where=filters, session_id=session_id):
+                yield encode({"token": token})
+            yield encode({"done": True, "session_id": session_id}, event="done")
+        except QueueFullError:
+            yield encode({"error": "Server busy", "details": "Too many questions waiting for an answer, retry later"},
+                         event="error")
+        except TimeoutError as e:
+            yield encode({"error": "Timed out", "details": str(e)}, event="error")
+        except Exception as e:
+            print(f"❌ Error streaming response: {str(e)}")
+            yield encode({"error": "Generation failed", "details": str(e)}, event="error")
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "text/event-stream"
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    # Stop proxies from buffering the stream
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 app.register_blueprint(Rmodel)
+init_metrics(app, 'chatbot')
+init_startup(app)
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
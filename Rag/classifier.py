@@ -0,0 +1,98 @@
+import numpy as np
+import re
+import threading
+
+
+# Topic descriptions whose embeddings act as centroids for the semantic fallback
+FINANCE_TOPICS = {
+    'markets': "stocks, bonds, equities, funds, commodities, forex and trading on financial markets",
+    'banking': "banks, loans, credit, debt, mortgages, interest rates and savings accounts",
+    'planning': "personal financial planning, budgeting, retirement, salary and investment advice",
+    'tax': "income tax, tax rates, deductions, returns and tax planning",
+    'insurance': "insurance policies, premiums and claims",
+    'economy': "the economy, inflation, economic growth, monetary and fiscal policy, public finance",
+}
+SEMANTIC_THRESHOLD = 0.45
+
+
+def _trie_pattern(words):
+    """
+    Regex alternation shaped like a trie over the words
+
+    Shared prefixes are factored out ('tax', 'tax rate', 'taxable' become
+    'tax(?:able| rate)?'), so at each position the engine follows a single
+    branch and matching stays linear in the input length.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        if '' in node and len(node) == 1:
+            return ''
+        end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # Prefer the longer match, but the word may also end here
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class FinanceClassifier:
+    """
+    Gate deciding whether a question is finance-related
+
+    Keywords are case-folded, de-duplicated and compiled once into a single
+    trie-shaped regex. Keywords must start at a word boundary, so
+    'stocks' and 'banking' still match 'stock' and 'bank' but 'forgive'
+    no longer matches 'give'. With semantic=True, questions without a
+    keyword hit are compared against embedded finance-topic centroids
+    (computed once, on first use).
+    """
+
+    def __init__(self, keywords, embed=None, semantic=False, threshold=SEMANTIC_THRESHOLD,
+                 topics=FINANCE_TOPICS):
+        self.keywords = sorted({keyword.casefold().strip() for keyword in keywords if keyword.strip()})
+        self.pattern = re.compile(r'\b' + _trie_pattern(self.keywords))
+        self.embed = embed
+        self.semantic = semantic and embed is not None
+        self.threshold = threshold
+        self.topics = topics
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    def match(self, question):
+        """First keyword found in the question, or None"""
+        found = self.pattern.search(question.casefold())
+        return found.group(0) if found else None
+
+    def _topic_centroids(self):
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    vectors = np.array([self.embed(text) for text in self.topics.values()], dtype=float)
+                    self._centroids = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return self._centroids
+
+    def semantic_score(self, question):
+        """Highest cosine similarity between the question and any finance topic"""
+        vector = np.asarray(self.embed(question), dtype=float)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        return float(np.max(self._topic_centroids() @ vector))
+
+    def is_finance(self, question):
+        if not question:
+            return False
+        if self.match(question) is not None:
+            return True
+        if self.semantic:
+            return self.semantic_score(question) >= self.threshold
+        return False
+
+    __call__ = is_finance
@@ -0,0 +1,198 @@
+from Techblitz.Jobs import QueueFullError
+from Techblitz.Metrics import registry
+import asyncio
+import hashlib
+import queue
+import threading
+
+
+# Concurrent model calls, calls allowed to wait for a slot, and seconds a caller waits
+LLM_CONCURRENCY = 8
+LLM_MAX_QUEUE = 64
+LLM_TIMEOUT = 60
+
+
+class _Stream:
+    """
+    Chunk iterator returned by LLMGateway.stream()
+
+    Unlike a generator, its cleanup runs even if it is closed or collected
+    before the first next(), so an abandoned stream never keeps its slot.
+    """
+
+    def __init__(self, gateway, chunks, future):
+        self._gateway = gateway
+        self._chunks = chunks
+        self._future = future
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        try:
+            chunk = self._chunks.get(timeout=self._gateway.timeout)
+        except queue.Empty:
+            self.close()
+            raise TimeoutError(f"No model response within {self._gateway.timeout}s")
+        if chunk is None:
+            self.close()
+            raise StopIteration
+        if isinstance(chunk, Exception):
+            self.close()
+            raise chunk
+        return chunk
+
+    def close(self):
+        """Cancel the call and free its slot; safe to call more than once"""
+        if not self._closed:
+            self._closed = True
+            self._future.cancel()
+            self._gateway._release()
+
+    def __del__(self):
+        self.close()
+
+
+class LLMGateway:
+    """
+    Async front for the chat model, shared by every request thread
+
+    Model calls run as coroutines (ainvoke where the model has it) on one
+    background event loop, so a slow network call holds a slot rather than
+    a thread's worth of blocking I/O. At most concurrency calls run at once
+    and at most max_queue more wait for a slot; beyond that invoke() raises
+    QueueFullError. Callers sending an identical prompt while it is in
+    flight share its result. A caller gives up after timeout seconds with
+    TimeoutError, and a call nobody waits for any more is cancelled.
+    stream() goes through the same slots and queue limit.
+    """
+
+    def __init__(self, model, concurrency=LLM_CONCURRENCY, max_queue=LLM_MAX_QUEUE, timeout=LLM_TIMEOUT):
+        # model is a callable returning the current chat model, so it can be swapped (e.g. for a stub)
+        self.model = model
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._semaphore = None
+        self._inflight = {}
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='llm-gateway', daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def _slots(self):
+        # Created on the gateway loop, which older asyncio versions bind it to
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    @staticmethod
+    async def _ainvoke(model, prompt):
+        if hasattr(model, 'ainvoke'):
+            return await model.ainvoke(prompt)
+        return await asyncio.get_running_loop().run_in_executor(None, model.invoke, prompt)
+
+    async def _call(self, prompt):
+        async with self._slots():
+            return await self._ainvoke(self.model(), prompt)
+
+    def _forget(self, key, entry):
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+
+    async def _request(self, prompt):
+        key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        entry = self._inflight.get(key)
+        # An entry without waiters is being cancelled, so start afresh
+        if entry is None or entry['waiters'] == 0:
+            entry = self._inflight[key] = {'task': asyncio.ensure_future(self._call(prompt)), 'waiters': 0}
+            entry['task'].add_done_callback(lambda _, done=entry: self._forget(key, done))
+        else:
+            registry.increment('llm_coalesced_total', help_text='Model calls shared with an identical in-flight prompt')
+        entry['waiters'] += 1
+        try:
+            # Shielded, so one caller timing out does not cancel the call for the others
+            return await asyncio.wait_for(asyncio.shield(entry['task']), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"No model response within {self.timeout}s")
+        finally:
+            entry['waiters'] -= 1
+            if entry['waiters'] == 0 and not entry['task'].done():
+                entry['task'].cancel()
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.concurrency + self.max_queue:
+                registry.increment('llm_rejected_total', help_text='Model calls rejected by the gateway queue limit')
+                raise QueueFullError("Too many model calls waiting")
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def invoke(self, prompt):
+        """Blocking call for request threads; returns the model's message"""
+        prompt = str(prompt)
+        self._admit()
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._request(prompt), self._ensure_loop())
+            return future.result()
+        finally:
+            self._release()
+
+    def stream(self, prompt):
+        """
+        Iterator over the model's message chunks, for request threads
+
+        The call counts against the queue limit at once (QueueFullError)
+        and holds a slot until the last chunk; streams are not coalesced.
+        Models without astream yield their whole answer as one chunk.
+        Iteration raises TimeoutError when no chunk arrives for timeout
+        seconds, and closing the iterator early (or dropping it, even before
+        the first chunk) cancels the call and frees the slot.
+        """
+        prompt = str(prompt)
+        self._admit()
+        try:
+            chunks = queue.Queue()
+            future = asyncio.run_coroutine_threadsafe(self._produce(prompt, chunks), self._ensure_loop())
+        except Exception:
+            self._release()
+            raise
+        return _Stream(self, chunks, future)
+
+    async def _produce(self, prompt, chunks):
+        # Chunks, then None when done, or the exception that ended the call
+        try:
+            async with self._slots():
+                model = self.model()
+                if hasattr(model, 'astream'):
+                    async for chunk in model.astream(prompt):
+                        chunks.put(chunk)
+                else:
+                    chunks.put(await self._ainvoke(model, prompt))
+            chunks.put(None)
+        except Exception as e:
+            chunks.put(e)
+
+    def full(self):
+        """Whether the next call would be rejected"""
+        with self._lock:
+            return self._pending >= self.concurrency + self.max_queue
+
+    def depth(self):
+        """Calls running or waiting for a slot"""
+        with self._lock:
+            return self._pending
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from contextlib import closing
+import numpy as np
+import sqlite3
+import threading
+import time
+import json
+
+
+# Cosine similarity at which an earlier answer is reused
+SIMILARITY_THRESHOLD = 0.92
+CACHE_TTL = 24 * 3600
+MAX_ENTRIES = 5000
+# Seconds between prunes of the SQLite tier by age and row count
+PRUNE_INTERVAL = 60
+
+
+class SemanticCache:
+    """
+    Answers keyed by prompt embedding, reused for near-identical prompts
+
+    A lookup is one matrix-vector product against the normalised embeddings
+    of the cached prompts. Entries expire after ttl and the least recently
+    hit are evicted beyond max_entries. With db_path set, entries are also
+    written to SQLite and reloaded at startup; every PRUNE_INTERVAL seconds
+    the table is cut back to rows younger than ttl and the newest
+    max_entries, so the file stays bounded. Answers are namespaced by the
+    retrieval filters they were produced with. Answers must be JSON-serialisable.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, ttl=CACHE_TTL,
+                 max_entries=MAX_ENTRIES, db_path=None):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._matrix = None
+        self._keys = []
+        self._next_id = 0
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        if db_path:
+            self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS answers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    namespace TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._prune(conn, time.time())
+            rows = conn.execute(
+                "SELECT namespace, embedding, answer, created_at FROM answers "
+                "ORDER BY created_at DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+        for namespace, blob, answer, created_at in reversed(rows):
+            self._add(namespace, np.frombuffer(blob, dtype=np.float32), json.loads(answer), created_at)
+
+    def _prune(self, conn, now):
+        """Delete expired rows and all but the newest max_entries"""
+        conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM answers WHERE id NOT IN (SELECT id FROM answers ORDER BY id DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._last_prune = now
+
+    @staticmethod
+    def namespace(filters):
+        return json.dumps(filters, sort_keys=True) if filters else ""
+
+    def _add(self, namespace, vector, answer, created_at):
+        key = self._next_id
+        self._next_id += 1
+        self._entries[key] = (namespace, vector, answer, created_at)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def _normalise(self, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding, filters=None):
+        """
+        Cached answer for a prompt embedding
+
+        Returns:
+            tuple: (answer, similarity), or (None, best similarity) on a miss
+        """
+        vector = self._normalise(embedding)
+        namespace = self.namespace(filters)
+        now = time.time()
+        with self._lock:
+            # Hits reorder entries, so the oldest-created is not necessarily first
+            expired = [k for k, e in self._entries.items() if now - e[3] > self.ttl]
+            for k in expired:
+                del self._entries[k]
+            if expired:
+                self._matrix = None
+
+            if not self._entries:
+                self.misses += 1
+                return None, 0.0
+            if self._matrix is None:
+                self._keys = list(self._entries)
+                self._matrix = np.vstack([self._entries[k][1] for k in self._keys])
+
+            scores = self._matrix @ vector
+            best_score = -1.0
+            best_key = None
+            for index in np.argsort(scores)[::-1]:
+                if scores[index] < self.threshold:
+                    break
+                if self._entries[self._keys[index]][0] == namespace:
+                    best_key, best_score = self._keys[index], float(scores[index])
+                    break
+
+            if best_key is None:
+                self.misses += 1
+                return None, float(scores.max())
+            self.hits += 1
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2], best_score
+
+    def put(self, embedding, answer, filters=None):
+        vector = self._normalise(embedding)
+        namespace = self.namespace(filters)
+        created_at = time.time()
+        with self._lock:
+            self._add(namespace, vector, answer, created_at)
+        if self.db_path:
+            try:
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "INSERT INTO answers (namespace, embedding, answer, created_at) VALUES (?, ?, ?, ?)",
+                        (namespace, vector.tobytes(), json.dumps(answer), created_at)
+                    )
+                    if created_at - self._last_prune >= PRUNE_INTERVAL:
+                        self._prune(conn, created_at)
+            except sqlite3.Error as e:
+                print(f"❌ Error persisting cached answer: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -1,15 +1,85 @@
 from flask import request, jsonify, Blueprint
 import os
-from langchain_mistralai.chat_models import ChatMistralAI
-import chromadb
+from Techblitz.Metrics import registry, stage
+from Techblitz.Startup import preload, timed
+from sessions import ConversationStore
+from classifier import FinanceClassifier
+from response_cache import SemanticCache, SIMILARITY_THRESHOLD
+from gateway import LLMGateway, LLM_CONCURRENCY, LLM_MAX_QUEUE, LLM_TIMEOUT
+from vector_store import open_collection
+from collections import OrderedDict
+import threading
+import json
+import time
 
 os.environ["MISTRAL_API_KEY"] = "236mWUjffs24Rg2pkQNfQiJNxg9EUxNO"
 
-client = chromadb.PersistentClient(path='db')
-collection = client.get_or_create_collection('collection')
 
-llm = ChatMistralAI(model="mistral-small", temperature=0.7, mistral_api_key=os.getenv("MISTRAL_API_KEY"))
-history = []
+# Retrieval settings: same encoder as Embed.py, chunks per query, and the
+# share of the prompt given to retrieved context (tokens ~ chars / 4)
+EMBED_MODEL = "all-MiniLM-L6-v2"
+TOP_K = 4
+CONTEXT_TOKEN_BUDGET = 2000
+# Cached query embeddings, and top-k results (which expire so re-ingested chunks show up)
+QUERY_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 300
+
+# The chat client, encoder and vector store are created on first use (or by PRELOAD),
+# so importing this module stays cheap. Assigning llm or collection replaces them
+llm = None
+collection = None
+_resource_lock = threading.Lock()
+
+
+def get_llm():
+    global llm
+    if llm is None:
+        with _resource_lock:
+            if llm is None:
+                with timed('init:llm'):
+                    from langchain_mistralai.chat_models import ChatMistralAI
+                    llm = ChatMistralAI(model="mistral-small", temperature=0.7,
+                                        mistral_api_key=os.getenv("MISTRAL_API_KEY"))
+    return llm
+
+
+def get_collection():
+    """The store Embed.py writes (VECTOR_DB_PATH); Chroma by default, or the memory-mapped VECTOR_BACKEND=quantized"""
+    global collection
+    if collection is None:
+        with _resource_lock:
+            if collection is None:
+                with timed('init:collection'):
+                    collection = open_collection()
+    return collection
+
+
+# ASYNC_LLM=1 sends answers through the async gateway (concurrency limit, queueing,
+# timeouts and coalescing of identical in-flight prompts) instead of blocking invokes
+llm_gateway = LLMGateway(
+    get_llm,
+    concurrency=int(os.getenv('LLM_CONCURRENCY', LLM_CONCURRENCY)),
+    max_queue=int(os.getenv('LLM_MAX_QUEUE', LLM_MAX_QUEUE)),
+    timeout=float(os.getenv('LLM_TIMEOUT', LLM_TIMEOUT))
+) if os.getenv('ASYNC_LLM') == '1' else None
+
+
+def summarize_turns(summary, turns):
+    """Fold turns leaving the window into the running summary with the LLM"""
+    transcript = "\n".join(f"{role}: {content}" for role, content in turns)
+    invoke = llm_gateway.invoke if llm_gateway is not None else get_llm().invoke
+    response = invoke(
+        "Update this summary of a financial consultation with the new exchange, in under 100 words.\n"
+        f"Summary so far: {summary or '(none)'}\nNew exchange:\n{transcript}"
+    )
+    return getattr(response, 'content', response)
+
+
+# Conversation memory per client session; set SUMMARIZE_HISTORY=1 to summarise turns
+# that fall out of the window instead of dropping them
+conversations = ConversationStore(
+    summarizer=summarize_turns if os.getenv('SUMMARIZE_HISTORY') == '1' else None
+)
 
 template = """
 You are an experienced financial consultant who helps clients with in their investment and financial planning.
@@ -49,27 +119,248 @@ finance_keywords = [
 
 
 
+class LRUCache:
+    """Small thread-safe LRU cache with an optional per-entry TTL"""
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at = item
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+_query_embeddings = LRUCache(QUERY_CACHE_SIZE)
+_query_results = LRUCache(QUERY_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+
+
+def get_embedder():
+    """Load the query encoder once per process"""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                with timed('init:embedder'):
+                    from sentence_transformers import SentenceTransformer
+                    _embedder = SentenceTransformer(EMBED_MODEL)
+    return _embedder
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def embed_query(text):
+    """Embedding of a query, served from the LRU cache for repeated questions"""
+    key = _normalize(text)
+    embedding = _query_embeddings.get(key)
+    if embedding is None:
+        embedding = get_embedder().encode([text])[0].tolist()
+        _query_embeddings.put(key, embedding)
+    return embedding
+
+
+def retrieve_chunks(prompt, k=TOP_K, where=None):
+    """Top-k chunks for a prompt as (document, metadata, distance), optionally filtered by metadata"""
+    key = (_normalize(prompt), k, json.dumps(where, sort_keys=True))
+    cached = _query_results.get(key)
+    if cached is not None:
+        registry.increment('retrieval_cache_total', help_text='Top-k result cache lookups', result='hit')
+        return cached
+    registry.increment('retrieval_cache_total', help_text='Top-k result cache lookups', result='miss')
+
+    results = get_collection().query(
+        query_embeddings=[embed_query(prompt)],
+        n_results=k,
+        where=where or None,
+        include=['documents', 'metadatas', 'distances']
+    )
+    chunks = list(zip(results['documents'][0], results['metadatas'][0], results['distances'][0]))
+    _query_results.put(key, chunks)
+    return chunks
+
+
+def pack_context(chunks, token_budget=CONTEXT_TOKEN_BUDGET):
+    """Join chunks in rank order until the budget is spent, truncating the last one"""
+    remaining = token_budget * 4
+    parts = []
+    for document, metadata, _ in chunks:
+        if remaining <= 0:
+            break
+        source = (metadata or {}).get('source', 'unknown')
+        text = document[:remaining]
+        parts.append(f"[{source}]\n{text}")
+        remaining -= len(text)
+    return "\n\n".join(parts)
+
+
+# Built once at import; SEMANTIC_GATE=1 adds the embedding fallback for keyword misses
+finance_gate = FinanceClassifier(
+    finance_keywords,
+    embed=embed_query,
+    semantic=os.getenv('SEMANTIC_GATE') == '1'
+)
+
+
+REFUSAL = "I'm sorry, I can only answer finance-related questions."
+
+
 def is_finance_related(question):
-    for keyword in finance_keywords:
-        if keyword in question.lower():
-            return True
-    return False
-   
+    return finance_gate.is_finance(question)
+
 
-def generate_response(prompt):
+# Answers reused for near-identical prompts, skipping retrieval and the LLM;
+# SEMANTIC_CACHE=0 disables it, SEMANTIC_CACHE_DB keeps answers across restarts
+response_cache = SemanticCache(
+    threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', SIMILARITY_THRESHOLD)),
+    db_path=os.getenv('SEMANTIC_CACHE_DB')
+) if os.getenv('SEMANTIC_CACHE', '1') != '0' else None
+
+
+def cached_answer(prompt, where=None):
+    """Earlier answer to a semantically equivalent prompt, plus its embedding for storing a new one"""
+    if response_cache is None:
+        return None, None
+    with stage('response_cache'):
+        try:
+            embedding = embed_query(prompt)
+            answer, _ = response_cache.lookup(embedding, where)
+        except Exception as e:
+            print(f"❌ Error in response cache: {str(e)}")
+            return None, None
+    registry.increment('response_cache_total', help_text='Semantic response cache lookups',
+                       result='hit' if answer is not None else 'miss')
+    return answer, embedding
    
-    if not is_finance_related(prompt):
-        return "I'm sorry, I can only answer finance-related questions." 
-    history.append({"role": "user", "content": prompt})
-    context = "\n".join([f"{turn['role']}: {turn['content']}" for turn in history])
-
-  
-    response = llm.invoke(context)
-    history.append({"role": "assistant", "content": response})
+
+def _prepare_turn(prompt, where, session_id):
+    """
+    Gate, cache lookup and retrieval shared by the blocking and streaming paths
+
+    Returns:
+        tuple: (answer, None) when no LLM call is needed, otherwise
+        (None, turn) where turn carries what finishing the exchange needs
+    """
+    with stage('keyword_filter'):
+        finance_related = is_finance_related(prompt)
+    registry.increment('finance_gate_total', help_text='Prompts checked by the finance keyword gate',
+                       result='accepted' if finance_related else 'rejected')
+    if not finance_related:
+        return {'text': REFUSAL, 'content': REFUSAL}, None
+
+    session = conversations.get(session_id)
+    # Follow-ups depend on the conversation, so only opening prompts use the cache
+    cached, embedding = cached_answer(prompt, where) if not session.turns else (None, None)
+    if cached is not None:
+        with session.lock:
+            session.add("user", prompt)
+            session.add("assistant", cached['content'])
+        return cached, None
+
+    with stage('retrieval'):
+        try:
+            retrieved = pack_context(retrieve_chunks(prompt, where=where))
+        except Exception as e:
+            print(f"❌ Error in retrieval: {str(e)}")
+            retrieved = ""
+
+    with session.lock:
+        session.add("user", prompt)
+        conversation = session.render()
+    context = f"Relevant documents:\n{retrieved}\n\n{conversation}" if retrieved else conversation
+    return None, {'session': session, 'context': context, 'embedding': embedding, 'where': where}
+
+
+def _finish_turn(turn, response):
+    """Record the model's reply in the session and the response cache; returns the reply text"""
     response_str = str(response)
+    content = getattr(response, 'content', response_str)
+    with turn['session'].lock:
+        turn['session'].add("assistant", content)
+    if turn['embedding'] is not None:
+        response_cache.put(turn['embedding'], {'text': response_str, 'content': content}, turn['where'])
     return response_str
 
 
+def generate_response(prompt, where=None, session_id=None):
+    answer, turn = _prepare_turn(prompt, where, session_id)
+    if answer is not None:
+        return answer['text']
+
+    with stage('llm'):
+        if llm_gateway is not None:
+            response = llm_gateway.invoke(turn['context'])
+        else:
+            response = get_llm().invoke(turn['context'])
+    return _finish_turn(turn, response)
+
+
+def llm_saturated():
+    """Whether the gateway would turn a model call away now (never without ASYNC_LLM)"""
+    return llm_gateway is not None and llm_gateway.full()
+
+
+def stream_response(prompt, where=None, session_id=None):
+    """
+    Yield the answer as text chunks while the model generates it
+
+    Refusals and cached answers come back as a single chunk. With
+    ASYNC_LLM the stream goes through the gateway's limits; otherwise
+    models without a stream method fall back to one blocking invoke. The
+    time to the first chunk is recorded as time_to_first_token_seconds.
+    """
+    started = time.perf_counter()
+    answer, turn = _prepare_turn(prompt, where, session_id)
+    if answer is not None:
+        yield answer['content']
+        return
 
+    response = None
+    first = True
+    with stage('llm'):
+        if llm_gateway is not None:
+            chunks = llm_gateway.stream(turn['context'])
+        else:
+            model = get_llm()
+            chunks = model.stream(turn['context']) if hasattr(model, 'stream') else [model.invoke(turn['context'])]
+        for chunk in chunks:
+            text = getattr(chunk, 'content', str(chunk))
+            if not text:
+                continue
+            if first:
+                first = False
+                registry.observe('time_to_first_token_seconds', time.perf_counter() - started,
+                                 help_text='Time from request to the first streamed token')
+            # Message chunks concatenate into one message, matching the blocking path
+            response = chunk if response is None else response + chunk
+            yield text
+    if response is not None:
+        _finish_turn(turn, response)
 
 
+# Before fork with a preloading server; see Startup.PRELOAD
+preload({
+    'embedder': get_embedder,
+    'chroma': get_collection,
+    'llm': get_llm
+})
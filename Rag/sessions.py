@@ -0,0 +1,111 @@
+from collections import OrderedDict, deque
+import threading
+import time
+
+
+# Prompt tokens kept per session for recent turns, and for the rolling summary of older ones
+HISTORY_TOKEN_BUDGET = 1500
+SUMMARY_TOKEN_BUDGET = 300
+# Sessions kept in memory, and seconds of inactivity before one is dropped
+MAX_SESSIONS = 1000
+SESSION_TTL = 1800
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), good enough for budgeting"""
+    return max(1, len(text) // 4)
+
+
+class Session:
+    """One client's conversation: a token-budgeted window of turns plus an optional summary"""
+
+    def __init__(self, token_budget=HISTORY_TOKEN_BUDGET, summarizer=None):
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.turns = deque()
+        self.tokens = 0
+        self.summary = ""
+        self.last_used = time.time()
+        self.lock = threading.Lock()
+
+    def add(self, role, content):
+        """Append a turn, then drop (or summarise) the oldest turns until the window fits"""
+        content = str(content)
+        cost = estimate_tokens(content)
+        self.turns.append((role, content, cost))
+        self.tokens += cost
+
+        dropped = []
+        # Always keep the newest turn, even if it alone exceeds the budget
+        while self.tokens > self.token_budget and len(self.turns) > 1:
+            old = self.turns.popleft()
+            self.tokens -= old[2]
+            dropped.append(old)
+
+        if dropped and self.summarizer is not None:
+            try:
+                summary = self.summarizer(self.summary, [(r, c) for r, c, _ in dropped])
+                self.summary = str(summary)[:SUMMARY_TOKEN_BUDGET * 4]
+            except Exception as e:
+                print(f"❌ Error summarising conversation: {str(e)}")
+
+    def render(self):
+        """Conversation text for the prompt"""
+        lines = []
+        if self.summary:
+            lines.append(f"summary of earlier conversation: {self.summary}")
+        lines.extend(f"{role}: {content}" for role, content, _ in self.turns)
+        return "\n".join(lines)
+
+
+class ConversationStore:
+    """
+    Session-scoped conversation memory
+
+    Sessions are looked up by a client-supplied ID and evicted when idle for
+    longer than ttl or, least recently used first, once more than
+    max_sessions are held. Each session's window is bounded by its token
+    budget, so memory and prompt size stay flat however long a server runs.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL,
+                 token_budget=HISTORY_TOKEN_BUDGET, summarizer=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Session for an ID, created on first use; None gets a fresh session that isn't kept"""
+        if session_id is None:
+            return Session(self.token_budget, self.summarizer)
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(self.token_budget, self.summarizer)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_used = now
+            return session
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self, now):
+        # Oldest-used sessions come first, so stop at the first live one
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_used <= self.ttl:
+                break
+            del self._sessions[session_id]
@@ -0,0 +1,42 @@
+from langchain_core.messages import AIMessage, AIMessageChunk
+import asyncio
+import time
+
+
+class StubChatModel:
+    """Offline stand-in for ChatMistralAI that answers after a fixed latency"""
+
+    def __init__(self, latency=0.5, reply="This is a stubbed financial answer."):
+        self.latency = latency
+        self.reply = reply
+        self.calls = 0
+
+    def _answer(self, prompt):
+        return f"{self.reply} ({len(str(prompt))} prompt chars)"
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency)
+        return AIMessage(content=self._answer(prompt))
+
+    async def ainvoke(self, prompt):
+        """Non-blocking invoke, so many calls can wait out the latency concurrently"""
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=self._answer(prompt))
+
+    async def astream(self, prompt):
+        """Non-blocking stream, as the gateway uses it"""
+        self.calls += 1
+        words = self._answer(prompt).split(' ')
+        for i, word in enumerate(words):
+            await asyncio.sleep(self.latency / len(words))
+            yield AIMessageChunk(content=word if i == 0 else ' ' + word)
+
+    def stream(self, prompt):
+        """Yield the reply word by word, spreading the latency across the words"""
+        self.calls += 1
+        words = self._answer(prompt).split(' ')
+        for i, word in enumerate(words):
+            time.sleep(self.latency / len(words))
+            yield AIMessageChunk(content=word if i == 0 else ' ' + word)
@@ -0,0 +1,452 @@
+import numpy as np
+import sqlite3
+import threading
+import json
+import os
+
+
+# Backend used by Embed.py and retrieve.py: 'chroma' or 'quantized'
+VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'chroma')
+# Store directory and collection shared by ingestion (Embed.py) and retrieval (retrieve.py);
+# CHROMA_PATH is still honoured. The quantized backend keeps its files in <name>.vectors inside it
+VECTOR_DB_PATH = os.getenv('VECTOR_DB_PATH') or os.getenv('CHROMA_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'data')
+COLLECTION_NAME = os.getenv('VECTOR_COLLECTION', 'collection')
+# Stored precision of the quantized backend: 'int8' (~4x smaller than float32) or 'float16' (~2x)
+VECTOR_DTYPE = os.getenv('VECTOR_DTYPE', 'int8')
+# IVF index: below MIN_INDEX_ROWS an exact scan is as fast. The lists searched per query
+# (nprobe) grow with the index: build_index() picks the smallest nprobe whose recall@4
+# reaches RECALL_TARGET on sample queries. VECTOR_NPROBE fixes it instead, and indexes
+# built before calibration existed probe PROBE_FRACTION of their lists
+MIN_INDEX_ROWS = 2000
+RECALL_TARGET = float(os.getenv('VECTOR_RECALL_TARGET', 0.95))
+NPROBE = int(os.getenv('VECTOR_NPROBE', 0)) or None
+PROBE_FRACTION = 0.1
+CALIBRATION_QUERIES = 64
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50000
+# Rows scored per block during exact scans, bounding the dequantized working set
+SCAN_BLOCK = 65536
+
+
+class QuantizedStore:
+    """
+    Chroma-compatible collection backed by a memory-mapped, quantized array
+
+    Embeddings are L2-normalised and stored row by row in a raw file, either
+    as float16 or as int8 with a float32 scale per row. The file is
+    memory-mapped, so opening a store reads only its small header and
+    queries page in just the rows they score. Chunk IDs, documents and
+    metadata live in a SQLite sidecar keyed by row. build_index() clusters
+    the rows into an IVF index (spherical k-means); a query then scores
+    only the nprobe closest lists, plus any rows added since the build;
+    nprobe is calibrated at build time to meet RECALL_TARGET.
+    Deleted chunks are tombstoned until compact() rewrites the files,
+    which renumbers rows and so is meant for maintenance windows.
+
+    Implements the subset of the Chroma collection API used by this
+    package: upsert, delete, query and count. Distances are 1 - cosine.
+    """
+
+    def __init__(self, path, dtype=None, nprobe=NPROBE):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._header_path = os.path.join(path, 'store.json')
+        if os.path.exists(self._header_path):
+            with open(self._header_path, encoding='utf-8') as f:
+                self.header = json.load(f)
+        else:
+            dtype = dtype or VECTOR_DTYPE
+            if dtype not in ('int8', 'float16'):
+                raise ValueError(f"Unsupported vector dtype: {dtype}")
+            self.header = {'dim': None, 'dtype': dtype, 'indexed_rows': 0}
+        self._db_path = os.path.join(path, 'chunks.sqlite')
+        # Writes go through one connection under the lock; query threads read through their own
+        self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._readers = threading.local()
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                document TEXT,
+                metadata TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._repair()
+        self._deleted = {row for (row,) in self._db.execute("SELECT row FROM chunks WHERE deleted = 1")}
+        self._maps = None
+        self._index = None
+
+    # --- files ---
+
+    @property
+    def dtype(self):
+        return np.int8 if self.header['dtype'] == 'int8' else np.float16
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _write_header(self):
+        tmp_path = self._header_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.header, f)
+        os.replace(tmp_path, self._header_path)
+
+    def _rows(self):
+        dim = self.header['dim']
+        if not dim or not os.path.exists(self._file('vectors.bin')):
+            return 0
+        return os.path.getsize(self._file('vectors.bin')) // (dim * np.dtype(self.dtype).itemsize)
+
+    def _repair(self):
+        """Undo a write interrupted part-way: trim partial rows and drop rows without a vector"""
+        rows = self._rows()
+        dim = self.header['dim']
+        if dim:
+            for name, row_bytes in (('vectors.bin', dim * np.dtype(self.dtype).itemsize), ('scales.bin', 4)):
+                if os.path.exists(self._file(name)) and os.path.getsize(self._file(name)) > rows * row_bytes:
+                    with open(self._file(name), 'r+b') as f:
+                        f.truncate(rows * row_bytes)
+        self._db.execute("DELETE FROM chunks WHERE row >= ?", (rows,))
+        self._db.commit()
+
+    def _mapped(self):
+        """Memory maps of the vectors (and int8 scales), reopened once the file has grown"""
+        rows = self._rows()
+        maps = self._maps
+        if maps is None or maps[0].shape[0] != rows:
+            if rows == 0:
+                return None, None
+            dim = self.header['dim']
+            vectors = np.memmap(self._file('vectors.bin'), dtype=self.dtype, mode='r', shape=(rows, dim))
+            scales = None
+            if self.header['dtype'] == 'int8':
+                scales = np.memmap(self._file('scales.bin'), dtype=np.float32, mode='r', shape=(rows,))
+            # Swapped in as one tuple so readers never pair vectors with the wrong scales
+            maps = self._maps = (vectors, scales)
+        return maps
+
+    def _load_index(self):
+        if self._index is None and self.header['indexed_rows'] and os.path.exists(self._file('ivf.npz')):
+            with np.load(self._file('ivf.npz')) as index:
+                self._index = {name: index[name] for name in index.files}
+        return self._index
+
+    # --- quantization ---
+
+    def _encode(self, embeddings):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if self.header['dtype'] == 'float16':
+            return vectors.astype(np.float16), None
+        scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+        return np.round(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _decode(self, rows, mapped=None):
+        """Dequantized float32 vectors for an array of row numbers (or a slice)"""
+        vectors, scales = mapped or self._mapped()
+        block = np.asarray(vectors[rows], dtype=np.float32)
+        if scales is not None:
+            block *= np.asarray(scales[rows])[:, None]
+        return block
+
+    # --- Chroma collection API ---
+
+    def count(self):
+        return self._rows() - len(self._deleted)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        """
+        Append chunks; IDs already stored are kept as they are
+
+        Chunk IDs are content-derived, so a known ID has the same text and
+        embedding. A previously deleted ID is simply restored.
+        """
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+        with self._lock:
+            existing = {}
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                marks = ','.join('?' * len(batch))
+                existing.update(self._db.execute(
+                    f"SELECT id, row FROM chunks WHERE id IN ({marks})", batch
+                ).fetchall())
+
+            restored = [existing[cid] for cid in ids if cid in existing and existing[cid] in self._deleted]
+            fresh = [i for i, cid in enumerate(ids) if cid not in existing]
+            # The same ID twice in one call is stored once
+            seen = set()
+            fresh = [i for i in fresh if not (ids[i] in seen or seen.add(ids[i]))]
+
+            if restored:
+                self._db.executemany("UPDATE chunks SET deleted = 0 WHERE row = ?", [(row,) for row in restored])
+                # Replaced rather than mutated, so concurrent queries see a consistent set
+                self._deleted = self._deleted - set(restored)
+            if fresh:
+                vectors, scales = self._encode([embeddings[i] for i in fresh])
+                if self.header['dim'] is None:
+                    self.header['dim'] = int(vectors.shape[1])
+                    self._write_header()
+                elif vectors.shape[1] != self.header['dim']:
+                    raise ValueError(f"Expected {self.header['dim']}-dimensional embeddings, got {vectors.shape[1]}")
+                first_row = self._rows()
+                # SQLite first: rows past the end of the vector file are never read
+                self._db.executemany(
+                    "INSERT INTO chunks (row, id, document, metadata) VALUES (?, ?, ?, ?)",
+                    [(first_row + n, ids[i], documents[i], json.dumps(metadatas[i] or {}))
+                     for n, i in enumerate(fresh)]
+                )
+                self._db.commit()
+                if scales is not None:
+                    with open(self._file('scales.bin'), 'ab') as f:
+                        f.write(scales.tobytes())
+                with open(self._file('vectors.bin'), 'ab') as f:
+                    f.write(vectors.tobytes())
+                self._maps = None
+            else:
+                self._db.commit()
+
+    def delete(self, ids):
+        with self._lock:
+            rows = []
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                marks = ','.join('?' * len(batch))
+                rows.extend(row for (row,) in self._db.execute(
+                    f"SELECT row FROM chunks WHERE id IN ({marks})", batch
+                ))
+            self._db.executemany("UPDATE chunks SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+            self._db.commit()
+            self._deleted = self._deleted | set(rows)
+
+    def query(self, query_embeddings, n_results=10, where=None, include=None, exact=False):
+        """Nearest chunks per query embedding, shaped like Chroma's query result"""
+        include = include or ['documents', 'metadatas', 'distances']
+        result = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for embedding in query_embeddings:
+            rows, scores = self._search(embedding, n_results, where, exact)
+            chunks = self._chunks(rows)
+            result['ids'].append([chunks[row][0] for row in rows])
+            result['documents'].append([chunks[row][1] for row in rows])
+            result['metadatas'].append([chunks[row][2] for row in rows])
+            result['distances'].append([float(1.0 - score) for score in scores])
+        return {key: value for key, value in result.items() if key == 'ids' or key in include}
+
+    # --- search ---
+
+    def _chunks(self, rows):
+        if not len(rows):
+            return {}
+        reader = getattr(self._readers, 'connection', None)
+        if reader is None:
+            reader = self._readers.connection = sqlite3.connect(self._db_path)
+        marks = ','.join('?' * len(rows))
+        found = reader.execute(
+            f"SELECT row, id, document, metadata FROM chunks WHERE row IN ({marks})", [int(r) for r in rows]
+        ).fetchall()
+        return {row: (cid, document, json.loads(metadata or '{}')) for row, cid, document, metadata in found}
+
+    def _nprobe(self, index):
+        nlist = len(index['centroids'])
+        return self.nprobe or self.header.get('nprobe') or max(1, int(np.ceil(PROBE_FRACTION * nlist)))
+
+    def _candidate_rows(self, query, total, exact, nprobe=None):
+        """Row numbers to score: the probed IVF lists plus unindexed rows, or None for everything"""
+        index = None if exact else self._load_index()
+        if index is None:
+            return None
+        probe = np.argsort(index['centroids'] @ query)[::-1][:nprobe or self._nprobe(index)]
+        offsets = index['offsets']
+        parts = [index['order'][offsets[c]:offsets[c + 1]] for c in probe]
+        indexed_rows = self.header['indexed_rows']
+        if total > indexed_rows:
+            parts.append(np.arange(indexed_rows, total))
+        candidates = np.sort(np.concatenate(parts))
+        # A search holding an older snapshot must not read past its end
+        return candidates[candidates < total]
+
+    def _search(self, embedding, k, where, exact, nprobe=None):
+        # One snapshot of the maps for the whole search, so concurrent appends cannot skew it
+        mapped = self._mapped()
+        if mapped[0] is None:
+            return [], []
+        total = mapped[0].shape[0]
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        candidates = self._candidate_rows(query, total, exact, nprobe)
+        if candidates is None:
+            scores = np.concatenate([
+                self._decode(slice(start, min(start + SCAN_BLOCK, total)), mapped) @ query
+                for start in range(0, total, SCAN_BLOCK)
+            ])
+            candidates = np.arange(total)
+        else:
+            scores = np.concatenate([
+                self._decode(candidates[start:start + SCAN_BLOCK], mapped) @ query
+                for start in range(0, len(candidates), SCAN_BLOCK)
+            ]) if len(candidates) else np.empty(0, dtype=np.float32)
+
+        deleted = self._deleted
+        if deleted:
+            live = ~np.isin(candidates, np.fromiter(deleted, dtype=np.int64, count=len(deleted)))
+            candidates, scores = candidates[live], scores[live]
+        ranked = np.argsort(scores)[::-1]
+        if not where:
+            ranked = ranked[:k]
+            return candidates[ranked].tolist(), scores[ranked].tolist()
+
+        # Metadata filters are checked best-first until k rows match
+        rows, kept = [], []
+        for start in range(0, len(ranked), max(k * 4, 64)):
+            window = ranked[start:start + max(k * 4, 64)]
+            chunks = self._chunks(candidates[window].tolist())
+            for position in window:
+                row = int(candidates[position])
+                if _matches(chunks[row][2], where):
+                    rows.append(row)
+                    kept.append(float(scores[position]))
+                    if len(rows) == k:
+                        return rows, kept
+        return rows, kept
+
+    # --- maintenance ---
+
+    def build_index(self, nlist=None, seed=0):
+        """Cluster the stored rows into an IVF index; small stores are left to exact scans"""
+        with self._lock:
+            total = self._rows()
+            if total < MIN_INDEX_ROWS:
+                self.header['indexed_rows'] = 0
+                self._write_header()
+                self._index = None
+                return 0
+            nlist = nlist or int(min(4 * np.sqrt(total), 4096))
+            rng = np.random.default_rng(seed)
+            sample = self._decode(np.sort(rng.choice(total, size=min(total, KMEANS_SAMPLE), replace=False)))
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+            for _ in range(KMEANS_ITERATIONS):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                counts = np.bincount(assignment, minlength=nlist)
+                # Empty lists keep their old centroid
+                filled = counts > 0
+                centroids[filled] = sums[filled]
+                centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+            assignment = np.concatenate([
+                np.argmax(self._decode(slice(start, min(start + SCAN_BLOCK, total))) @ centroids.T, axis=1)
+                for start in range(0, total, SCAN_BLOCK)
+            ])
+            order = np.argsort(assignment, kind='stable').astype(np.int64)
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))]).astype(np.int64)
+            tmp_path = self._file('ivf.tmp.npz')
+            np.savez(tmp_path, centroids=centroids.astype(np.float32), order=order, offsets=offsets)
+            os.replace(tmp_path, self._file('ivf.npz'))
+            self.header['indexed_rows'] = int(total)
+            self._index = None
+            if not self.nprobe:
+                self.header['nprobe'] = self._calibrate(total, nlist, rng)
+            self._write_header()
+            return nlist
+
+    def _calibrate(self, total, nlist, rng):
+        """Smallest power-of-two nprobe whose recall@4 reaches RECALL_TARGET"""
+        # Midpoints of random pairs of stored rows: near the data, but not stored rows themselves
+        sample = self._decode(np.sort(rng.choice(total, size=min(total, 2 * CALIBRATION_QUERIES), replace=False)))
+        rng.shuffle(sample)
+        half = len(sample) // 2
+        queries = sample[:half] + sample[half:2 * half]
+        exact = [set(self._search(query, 4, None, exact=True)[0]) for query in queries]
+        nprobe = 1
+        while nprobe < nlist:
+            found = sum(len(set(self._search(query, 4, None, False, nprobe)[0]) & rows)
+                        for query, rows in zip(queries, exact))
+            if found >= RECALL_TARGET * sum(len(rows) for rows in exact):
+                break
+            nprobe *= 2
+        return int(min(nprobe, nlist))
+
+    def compact(self):
+        """Rewrite the files without tombstoned rows, then rebuild the index"""
+        with self._lock:
+            total = self._rows()
+            if not self._deleted or total == 0:
+                return 0
+            live = np.setdiff1d(np.arange(total), np.fromiter(self._deleted, dtype=np.int64))
+            vectors, scales = self._mapped()
+            with open(self._file('vectors.tmp'), 'wb') as f:
+                for start in range(0, len(live), SCAN_BLOCK):
+                    f.write(np.asarray(vectors[live[start:start + SCAN_BLOCK]]).tobytes())
+            has_scales = scales is not None
+            if has_scales:
+                with open(self._file('scales.tmp'), 'wb') as f:
+                    f.write(np.asarray(scales[live]).tobytes())
+            # Mapped files cannot be replaced on Windows
+            del vectors, scales
+            self._maps = None
+
+            self._db.execute("DELETE FROM chunks WHERE deleted = 1")
+            # Renumber rows in their existing order; rows only move down, so ascending is safe
+            self._db.executemany("UPDATE chunks SET row = ? WHERE row = ?",
+                                 [(new, int(old)) for new, old in enumerate(live)])
+            self._db.commit()
+            os.replace(self._file('vectors.tmp'), self._file('vectors.bin'))
+            if has_scales:
+                os.replace(self._file('scales.tmp'), self._file('scales.bin'))
+            removed = len(self._deleted)
+            self._deleted = set()
+            self.header['indexed_rows'] = 0
+            self._write_header()
+            self._index = None
+        self.build_index()
+        return removed
+
+    def memory_bytes(self):
+        """On-disk size of the vectors, scales and index (what queries may page in)"""
+        return sum(os.path.getsize(self._file(name)) for name in ('vectors.bin', 'scales.bin', 'ivf.npz')
+                   if os.path.exists(self._file(name)))
+
+
+def _matches(metadata, where):
+    """Chroma-style equality filter: {'key': value}, {'key': {'$eq': value}} or {'$and': [...]}"""
+    for key, condition in where.items():
+        if key == '$and':
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if set(condition) - {'$eq'}:
+                raise ValueError(f"Unsupported filter on '{key}': {condition}")
+            if metadata.get(key) != condition['$eq']:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def recall_at_k(store, queries, k=4, nprobe=None):
+    """Share of the exact top-k rows that the approximate search also returns"""
+    found = 0
+    for query in queries:
+        approximate, _ = store._search(query, k, None, exact=False, nprobe=nprobe)
+        exact, _ = store._search(query, k, None, exact=True)
+        found += len(set(approximate) & set(exact))
+    return found / max(1, k * len(queries))
+
+
+def open_collection(path=None, name=None, backend=None):
+    """Collection for ingestion and retrieval, from the configured backend and store"""
+    path = path or VECTOR_DB_PATH
+    name = name or COLLECTION_NAME
+    backend = backend or VECTOR_BACKEND
+    if backend == 'quantized':
+        return QuantizedStore(os.path.join(path, name + '.vectors'))
+    if backend == 'chroma':
+        import chromadb
+        return chromadb.PersistentClient(path=path).get_or_create_collection(name)
+    raise ValueError(f"Unknown vector backend: {backend}")
@@ -0,0 +1,265 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+# Defaults for the shared store: location, retention by age (days) and size (bytes)
+RESULTS_DB = os.getenv('RESULTS_DB', 'results/results.sqlite')
+RESULTS_MAX_AGE_DAYS = float(os.getenv('RESULTS_MAX_AGE_DAYS', 90))
+RESULTS_MAX_BYTES = int(os.getenv('RESULTS_MAX_BYTES', 512 * 1024 * 1024))
+# Writer batching, and how often retention runs (s)
+WRITE_BATCH = 256
+FLUSH_INTERVAL = 1.0
+RETENTION_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    model_key TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS rows (
+    run INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_kind_time ON runs (kind, created_at);
+CREATE INDEX IF NOT EXISTS runs_model_key ON runs (model_key);
+CREATE INDEX IF NOT EXISTS rows_metric_time ON rows (metric, created_at);
+CREATE INDEX IF NOT EXISTS rows_run ON rows (run);
+"""
+
+class ResultsStore:
+    """
+    Append-only SQLite store for analysis results, with retention
+
+    record() queues a run (its parameters plus one row per metric) and
+    returns its ID at once; a writer thread commits queued runs in batches
+    of up to batch_size, at least every flush_interval seconds. Runs are
+    indexed by kind, time, metric and model key, and query() filters on
+    those and on parameter values. Every retention_interval seconds runs
+    older than max_age_days are deleted, then the oldest runs until the
+    database fits in max_bytes, and the freed pages are vacuumed away.
+    """
+
+    def __init__(self, path=RESULTS_DB, max_age_days=RESULTS_MAX_AGE_DAYS, max_bytes=RESULTS_MAX_BYTES,
+                 batch_size=WRITE_BATCH, flush_interval=FLUSH_INTERVAL, retention_interval=RETENTION_INTERVAL):
+        self.path = path
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_interval = retention_interval
+        self._queue = queue.Queue()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._writer = None
+        self._ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _init_db(self):
+        """Create the database on first use (caller holds the lock)"""
+        if self._ready:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            # Only takes effect on a new database; lets compaction free pages incrementally
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+        self._ready = True
+
+    def record(self, kind, rows, params=None, model_key=None):
+        """
+        Queue a run for writing
+
+        Args:
+            kind (str): Result type, e.g. 'prediction' or 'statistics'
+            rows (list): Dicts with a 'metric' key, stored as JSON
+            params (dict): Parameters the run used, queryable by value
+            model_key (str): Fitted-model key the run came from
+
+        Returns:
+            str: Run ID
+        """
+        run_id = uuid.uuid4().hex
+        self._queue.put((run_id, kind, time.time(), model_key, params or {}, rows))
+        self._wakeup.set()
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._init_db()
+                    self._writer = threading.Thread(target=self._run, name='results-writer', daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+        return run_id
+
+    def flush(self):
+        """Write everything queued so far"""
+        with self._lock:
+            self._init_db()
+            self._flush()
+
+    def _flush(self):
+        # Runs leave the queue only under the lock, so a flush never misses one in flight
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def _drain(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """Commit a batch of runs in one transaction (caller holds the lock)"""
+        if not batch:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                for run_id, kind, created_at, model_key, params, rows in batch:
+                    cursor = conn.execute(
+                        "INSERT INTO runs (run_id, kind, created_at, model_key, params) VALUES (?, ?, ?, ?, ?)",
+                        (run_id, kind, created_at, model_key, json.dumps(params, sort_keys=True))
+                    )
+                    conn.executemany(
+                        "INSERT INTO rows (run, metric, created_at, data) VALUES (?, ?, ?, ?)",
+                        [(cursor.lastrowid, str(row.get('metric')), created_at, json.dumps(row, default=str))
+                         for row in rows]
+                    )
+        except sqlite3.Error as e:
+            print(f"❌ Error writing results: {str(e)}")
+
+    def _run(self):
+        last_retention = 0.0
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            with self._lock:
+                self._flush()
+                if time.time() - last_retention >= self.retention_interval:
+                    last_retention = time.time()
+                    self._enforce_retention()
+
+    def enforce_retention(self):
+        """Apply age and size limits now; returns the number of runs deleted"""
+        with self._lock:
+            self._init_db()
+            return self._enforce_retention()
+
+    def _enforce_retention(self):
+        deleted = 0
+        try:
+            with closing(self._connect()) as conn, conn:
+                if self.max_age:
+                    deleted += conn.execute(
+                        "DELETE FROM runs WHERE created_at < ?", (time.time() - self.max_age,)
+                    ).rowcount
+                if self.max_bytes:
+                    while True:
+                        # Free pages are excluded, so deletions count before they are vacuumed
+                        used = self._used_bytes(conn)
+                        runs = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+                        if used <= self.max_bytes or runs == 0:
+                            break
+                        # Drop a share of the oldest runs proportional to the overshoot
+                        excess = max(1, int(runs * (1 - self.max_bytes / used)) + 1)
+                        deleted += conn.execute(
+                            "DELETE FROM runs WHERE id IN (SELECT id FROM runs ORDER BY created_at LIMIT ?)",
+                            (excess,)
+                        ).rowcount
+                        conn.commit()
+                conn.commit()
+                if deleted:
+                    # Return freed pages to the filesystem; executescript steps the pragma to completion
+                    conn.executescript("PRAGMA incremental_vacuum;")
+                    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            print(f"❌ Error applying results retention: {str(e)}")
+        return deleted
+
+    @staticmethod
+    def _used_bytes(conn):
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def compact(self):
+        """Rewrite the whole database file (full VACUUM)"""
+        with self._lock:
+            self._init_db()
+            conn = self._connect()
+            try:
+                conn.execute("VACUUM")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+
+    def query(self, kind=None, metric=None, since=None, until=None, params=None, model_key=None, run_id=None,
+              limit=100):
+        """
+        Stored result rows, newest first
+
+        Args:
+            kind (str): Result type
+            metric (str): Metric name, e.g. 'Revenue_Growth'
+            since, until (float): Time range as Unix timestamps
+            params (dict): Parameter values the run must have used
+            model_key (str): Fitted-model key
+            run_id (str): ID returned by record()
+            limit (int): Maximum rows returned
+
+        Returns:
+            list: Dicts with run_id, kind, created_at, model_key, params and data
+        """
+        self.flush()
+        clauses, args = [], []
+        for column, value in (('runs.kind', kind), ('rows.metric', metric), ('runs.model_key', model_key),
+                              ('runs.run_id', run_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("rows.created_at >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("rows.created_at <= ?")
+            args.append(until)
+        for name, value in (params or {}).items():
+            clauses.append("json_extract(runs.params, ?) = ?")
+            args.extend([f'$.{name}', value])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self._connect()) as conn, conn:
+            found = conn.execute(
+                f"SELECT runs.run_id, runs.kind, rows.created_at, runs.model_key, runs.params, rows.data "
+                f"FROM rows JOIN runs ON runs.id = rows.run {where} "
+                f"ORDER BY rows.created_at DESC LIMIT ?", args + [int(limit)]
+            ).fetchall()
+        return [
+            {'run_id': run_id, 'kind': kind, 'created_at': created_at, 'model_key': model_key,
+             'params': json.loads(params or '{}'), 'data': json.loads(data)}
+            for run_id, kind, created_at, model_key, params, data in found
+        ]
+
+results_store = ResultsStore()
@@ -0,0 +1,76 @@
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Heavy resources to load at import time, comma-separated (e.g. PRELOAD=statsmodels,charts).
+# With a prefork server that imports the app before forking (gunicorn --preload), workers
+# share what was loaded copy-on-write instead of each paying for it on its first request
+PRELOAD = [name.strip() for name in os.getenv('PRELOAD', '').split(',') if name.strip()]
+
+_started = time.perf_counter()
+_steps = []
+_lock = threading.Lock()
+
+def record_step(name, seconds):
+    """Add a step to the startup report"""
+    with _lock:
+        _steps.append((name, seconds))
+
+@contextmanager
+def timed(name):
+    """Time the enclosed block as a startup step"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_step(name, time.perf_counter() - start)
+
+def lazy_import(module_name):
+    """Import a module on first use, recording the first import as a step"""
+    # Always go through import_module: a module already in sys.modules may still be
+    # initialising in another thread, and import_module waits for it to finish
+    with timed(f'import:{module_name}') if module_name not in sys.modules else nullcontext():
+        return importlib.import_module(module_name)
+
+def preload(loaders, names=None):
+    """
+    Run the named loaders now
+
+    Args:
+        loaders (dict): Resource name -> zero-argument function loading it
+        names (list): Resources to load (defaults to PRELOAD); 'all' loads every one
+    """
+    names = PRELOAD if names is None else names
+    if 'all' in names:
+        names = list(loaders)
+    for name in names:
+        loader = loaders.get(name)
+        if loader is None:
+            continue
+        try:
+            with timed(f'preload:{name}'):
+                loader()
+        except Exception as e:
+            print(f"❌ Error preloading {name}: {str(e)}")
+
+def report():
+    """Startup steps in order, with the time since this module was first imported"""
+    with _lock:
+        steps = list(_steps)
+    return {
+        'steps': [{'name': name, 'seconds': round(seconds, 4)} for name, seconds in steps],
+        'seconds_since_import': round(time.perf_counter() - _started, 4),
+        'preloaded': PRELOAD,
+        'modules_loaded': len(sys.modules)
+    }
+
+def init_app(app):
+    """Add a /startup endpoint reporting import and initialisation cost"""
+    from flask import jsonify
+
+    @app.route('/startup', methods=['GET'])
+    def startup_report():
+        return jsonify(report())
@@ -1,45 +1,486 @@
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.stattools import kpss
 from sklearn.metrics import mean_squared_error
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import wait, as_completed, FIRST_COMPLETED
+from collections import OrderedDict
+import itertools
+import hashlib
+import threading
+import time
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
-def train_arima(series, order=(1,1,1)):
+# Training mode for train_all_metrics: 'serial', 'threads' or 'processes'
+TRAINING_MODE = 'serial'
+# Seconds to wait for the targets' fits in parallel modes, from one shared start (None = no limit)
+TARGET_TIMEOUT = None
+# Workers in each shared pool
+POOL_WORKERS = os.cpu_count() or 1
+
+DEFAULT_ORDER = (1, 1, 1)
+# Order search: bounded (p,d,q) grid, selection criterion and total wall-clock budget (s)
+ORDER_GRID = {'max_p': 3, 'max_d': 1, 'max_q': 3}
+ORDER_CRITERION = 'aic'
+# KPSS significance level for choosing d before the (p, q) search
+DIFFERENCING_ALPHA = 0.05
+ORDER_SEARCH_BUDGET = 10.0
+ORDER_CACHE_SIZE = 256
+
+# Chosen orders keyed by (series hash, criterion), most recently used last
+_order_cache = OrderedDict()
+_order_cache_lock = threading.Lock()
+
+# Pools shared by every request, keyed by mode ('threads' or 'processes')
+_executors = {}
+_executors_lock = threading.Lock()
+
+def _executor(mode):
+    """Shared pool for a mode, created on first use (or again if a worker died)"""
+    with _executors_lock:
+        executor = _executors.get(mode)
+        if executor is None or getattr(executor, '_broken', False):
+            executor_cls = ProcessPoolExecutor if mode == 'processes' else ThreadPoolExecutor
+            executor = _executors[mode] = executor_cls(max_workers=POOL_WORKERS)
+        return executor
+
+def _close_pool(executor, terminate=False):
+    """Shut down a pool owned by one call, terminating its processes if work overran"""
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    if terminate:
+        for process in processes:
+            process.terminate()
+
+def _fit(model, deadline=None):
+    """Fit a model, giving up at the first optimizer iteration after deadline (Unix time)"""
+    if deadline is None:
+        return model.fit()
+
+    def check_deadline(params):
+        if time.time() > deadline:
+            raise TimeoutError("Fit overran its deadline")
+
+    return model.fit(method_kwargs={'callback': check_deadline})
+
+def train_arima(series, order=(1,1,1), deadline=None):
     """Train ARIMA model and make predictions"""
     # Split data into train and test
     train_size = int(len(series) * 0.8)
     train, test = series[:train_size], series[train_size:]
-    
+
     # Fit ARIMA model
     model = ARIMA(train, order=order)
-    results = model.fit()
-    
+    results = _fit(model, deadline)
+
     # Make predictions
     predictions = results.forecast(steps=len(test))
-    
+
     # Calculate MSE
     mse = mean_squared_error(test, predictions)
-    
+
     return predictions, mse, results
 
-def train_all_metrics(data, targets):
-    """Train ARIMA models for all target metrics"""
+def series_fingerprint(series):
+    """Stable hash of a series' index and values"""
+    hashed = pd.util.hash_pandas_object(series, index=True).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+def select_d(series, max_d, alpha=DIFFERENCING_ALPHA):
+    """
+    Differencing order from repeated KPSS tests
+
+    The series is differenced until KPSS no longer rejects stationarity at
+    alpha, up to max_d times.
+    """
+    values = np.asarray(series, dtype=float)
+    for d in range(max_d):
+        try:
+            p_value = kpss(values, regression='c', nlags='auto')[1]
+        except Exception:
+            return d
+        if p_value >= alpha:
+            return d
+        values = np.diff(values)
+    return max_d
+
+def _score_order(series, order, criterion, deadline=None):
+    """Fit a candidate order and return its score, or None if the fit is unusable"""
+    try:
+        if criterion == 'mse':
+            train_size = int(len(series) * 0.8)
+            train, test = series[:train_size], series[train_size:]
+            results = _fit(ARIMA(train, order=order), deadline)
+            score = mean_squared_error(test, results.forecast(steps=len(test)))
+        else:
+            results = _fit(ARIMA(series, order=order), deadline)
+            score = results.aic if criterion == 'aic' else results.bic
+    except Exception:
+        return None
+
+    # Prune fits the optimizer gave up on
+    if not results.mle_retvals.get('converged', True) or not np.isfinite(score):
+        return None
+    return float(score)
+
+def select_order(series, criterion=None, budget=None, grid=None, mode='threads'):
+    """
+    Search a bounded (p,d,q) grid for the best ARIMA order
+
+    AIC and BIC are only comparable between fits on the same differenced
+    data, so for those criteria d is chosen first with select_d and only
+    (p, q) are searched. The hold-out 'mse' criterion compares every d.
+    Candidates are submitted as workers free up, and fits still running
+    when the budget runs out abort at their next optimizer iteration.
+
+    Args:
+        series (pd.Series): Series to model
+        criterion (str): 'aic', 'bic' or 'mse' (hold-out) - lower is better
+        budget (float): Wall-clock seconds allowed for the search
+        grid (dict): Upper bounds 'max_p', 'max_d' and 'max_q'
+        mode (str): 'threads' or 'processes' for candidate evaluation
+
+    Returns:
+        tuple: Best order found, DEFAULT_ORDER if no candidate converged in time
+    """
+    criterion = criterion or ORDER_CRITERION
+    budget = budget if budget is not None else ORDER_SEARCH_BUDGET
+    grid = grid or ORDER_GRID
+    if criterion not in ('aic', 'bic', 'mse'):
+        raise ValueError(f"Unknown order selection criterion: {criterion}")
+
+    key = (series_fingerprint(series), criterion)
+    with _order_cache_lock:
+        if key in _order_cache:
+            _order_cache.move_to_end(key)
+            return _order_cache[key]
+
+    deadline = time.time() + budget
+    if criterion == 'mse':
+        d_values = range(grid['max_d'] + 1)
+    else:
+        d_values = [select_d(series, grid['max_d'])]
+    candidates = list(itertools.product(range(grid['max_p'] + 1), d_values, range(grid['max_q'] + 1)))
+
+    executor = _executor(mode)
+    remaining = iter(candidates)
+    pending, scored, finished = {}, [], 0
+    while True:
+        # Keep at most one candidate per worker in flight
+        while len(pending) < POOL_WORKERS:
+            order = next(remaining, None)
+            if order is None:
+                break
+            pending[executor.submit(_score_order, series, order, criterion, deadline)] = order
+        time_left = deadline - time.time()
+        if not pending or time_left <= 0:
+            break
+        done, _ = wait(pending, timeout=time_left, return_when=FIRST_COMPLETED)
+        for future in done:
+            order = pending.pop(future)
+            finished += 1
+            if future.exception() is None and future.result() is not None:
+                scored.append((future.result(), order))
+    for future in pending:
+        future.cancel()
+
+    if not scored:
+        # Nothing converged in time - don't remember, a later call may do better
+        return DEFAULT_ORDER
+
+    best_order = min(scored)[1]
+    # Only remember complete searches so a budget cut-off can't pin a worse order
+    if finished == len(candidates):
+        with _order_cache_lock:
+            _order_cache[key] = best_order
+            if len(_order_cache) > ORDER_CACHE_SIZE:
+                _order_cache.popitem(last=False)
+    return best_order
+
+def _train_target(series, order=DEFAULT_ORDER, deadline=None):
+    """Train a single target, catching failures so one bad fit doesn't sink the batch"""
+    try:
+        start = time.perf_counter()
+        predictions, mse, model = train_arima(series, order=order, deadline=deadline)
+        return {
+            'predictions': predictions,
+            'mse': mse,
+            'model': model,
+            'order': tuple(order),
+            'fit_seconds': time.perf_counter() - start
+        }
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {str(e)}"}
+
+def _train_parallel(data, targets, orders, mode, timeout):
+    """
+    Fit each target in parallel and collect results in target order
+
+    Fits run on the shared pool and stop at the first optimizer iteration
+    past the deadline (see _fit). Timed process-mode training gets a pool
+    of its own instead, so fits that overrun anyway can be terminated
+    without touching other requests' work.
+    """
+    own_pool = mode == 'processes' and bool(timeout)
+    if own_pool:
+        executor = ProcessPoolExecutor(max_workers=max(1, min(len(targets), POOL_WORKERS)))
+    else:
+        executor = _executor(mode)
+    # One deadline for all targets, so the last one doesn't wait len(targets) x timeout
+    deadline = time.time() + timeout if timeout else None
+    futures = {
+        target: executor.submit(_train_target, data[target], orders[target], deadline)
+        for target in targets
+    }
+    _, not_done = wait(futures.values(), timeout=timeout)
+
     results_dict = {}
-    
+    overran = False
+    for target, future in futures.items():
+        if future in not_done:
+            overran = not future.cancel() or overran
+            results_dict[target] = {'error': f"Training timed out after {timeout}s"}
+            continue
+        try:
+            results_dict[target] = future.result()
+        except Exception as e:
+            results_dict[target] = {'error': f"{type(e).__name__}: {str(e)}"}
+
+    if own_pool:
+        _close_pool(executor, terminate=overran)
+    return results_dict
+
+def fit_targets(data, targets, orders, mode, timeout=None):
+    """Fit every target with its order, serially or on the shared pool"""
+    if mode == 'serial' or len(targets) < 2:
+        return {target: _train_target(data[target], orders[target]) for target in targets}
+    return _train_parallel(data, targets, orders, mode, timeout)
+
+def resolve_orders(data, targets, order, mode):
+    """Map each target to a fixed order, or search one per target within the shared budget"""
+    if order != 'auto':
+        return {target: tuple(order or DEFAULT_ORDER) for target in targets}
+
+    orders = {}
+    deadline = time.monotonic() + ORDER_SEARCH_BUDGET
+    search_mode = 'processes' if mode == 'processes' else 'threads'
+    for i, target in enumerate(targets):
+        remaining = max(0.0, deadline - time.monotonic())
+        orders[target] = select_order(
+            data[target], budget=remaining / (len(targets) - i), mode=search_mode
+        )
+    return orders
+
+def train_all_metrics(data, targets, mode=None, timeout=None, order=None):
+    """
+    Train ARIMA models for all target metrics
+
+    Args:
+        data (pd.DataFrame): Time-indexed data containing the target columns
+        targets (list): Columns to train a model for
+        mode (str): 'serial', 'threads' or 'processes' (defaults to TRAINING_MODE)
+        timeout (float): Seconds allowed for all targets' fits in parallel modes,
+            from one shared start (defaults to TARGET_TIMEOUT)
+        order (tuple or str): ARIMA order for every target, or 'auto' to search
+            one per target with select_order (defaults to DEFAULT_ORDER)
+
+    Returns:
+        dict: Per-target 'predictions', 'mse', 'model' and 'order', or 'error'
+            if the fit failed
+    """
+    mode = mode or TRAINING_MODE
+    timeout = timeout if timeout is not None else TARGET_TIMEOUT
+    if mode not in ('serial', 'threads', 'processes'):
+        raise ValueError(f"Unknown training mode: {mode}")
+
+    orders = resolve_orders(data, targets, order, mode)
+
     print("Training ARIMA models...")
     print("=" * 50)
-    
+
+    results_dict = fit_targets(data, targets, orders, mode, timeout)
+
     for target in targets:
-        predictions, mse, model = train_arima(data[target])
-        results_dict[target] = {
-            'predictions': predictions,
-            'mse': mse,
-            'model': model
-        }
+        result = results_dict[target]
         print(f"\n{target}:")
-        print(f"Mean Squared Error: {mse:.4f}")
-        print(f"Next Month Prediction: {predictions[-1]:.2f}")
+        if 'error' in result:
+            print(f"❌ Training failed: {result['error']}")
+        else:
+            print(f"Order: {result['order']}")
+            print(f"Mean Squared Error: {result['mse']:.4f}")
+            print(f"Next Month Prediction: {result['predictions'][-1]:.2f}")
         print("-" * 30)
-    
-    return results_dict
\ No newline at end of file
+
+    return results_dict
+
+def _backtest_block(values, order, params, origins, horizon, window):
+    """
+    Forecast from each origin in a contiguous block without refitting
+
+    The model is filtered with the shared parameters up to the first origin,
+    then moved forward by extending it with the new observations (expanding
+    window) or re-applying it to the shifted window (rolling window).
+    """
+    errors = np.full((len(origins), horizon), np.nan)
+    start = origins[0]
+    results = ARIMA(values[start - window if window else 0:start], order=order).filter(params)
+    position = start
+
+    for i, origin in enumerate(origins):
+        if origin > position:
+            if window:
+                results = results.apply(values[origin - window:origin], refit=False)
+            else:
+                results = results.extend(values[position:origin])
+            position = origin
+
+        steps = min(horizon, len(values) - origin)
+        forecast = np.asarray(results.forecast(steps=steps))
+        errors[i, :steps] = values[origin:origin + steps] - forecast
+
+    return errors
+
+def backtest_arima(series, order=DEFAULT_ORDER, horizon=3, initial=None, step=1,
+                   window=None, mode='threads', workers=None):
+    """
+    Walk-forward backtest of an ARIMA order
+
+    Parameters are estimated once on the initial window. Every later origin
+    reuses them and only runs the Kalman filter over the new observations,
+    so hundreds of origins cost little more than one fit. Origins are split
+    into contiguous blocks that run in parallel.
+
+    Args:
+        series (pd.Series): Series to backtest
+        order (tuple): ARIMA order
+        horizon (int): Forecast steps evaluated from each origin
+        initial (int): Observations before the first origin (defaults to half the series)
+        step (int): Observations between origins
+        window (int): Rolling window length; None uses an expanding window
+        mode (str): 'serial', 'threads' or 'processes'
+        workers (int): Parallel blocks (defaults to the core count)
+
+    Returns:
+        dict: Origin count and per-horizon 'mae', 'rmse', 'mape' and 'n'
+    """
+    values = np.asarray(series, dtype=float)
+    initial = initial or max(len(values) // 2, sum(order) + 2)
+    if window and window > initial:
+        raise ValueError("Rolling window cannot be longer than the initial window")
+    origins = list(range(initial, len(values), step))
+    if not origins:
+        raise ValueError("Series too short for the requested backtest")
+
+    fit_values = values[initial - window if window else 0:initial]
+    params = ARIMA(fit_values, order=order).fit().params
+
+    workers = 1 if mode == 'serial' else (workers or os.cpu_count() or 1)
+    blocks = [list(block) for block in np.array_split(origins, min(workers, len(origins)))]
+    if len(blocks) == 1:
+        errors = _backtest_block(values, order, params, blocks[0], horizon, window)
+    else:
+        executor = _executor('processes' if mode == 'processes' else 'threads')
+        futures = [
+            executor.submit(_backtest_block, values, order, params, block, horizon, window)
+            for block in blocks
+        ]
+        errors = np.vstack([future.result() for future in futures])
+
+    # Percentage errors against the actual value at each origin/horizon
+    actuals = np.full(errors.shape, np.nan)
+    for i, origin in enumerate(origins):
+        steps = min(horizon, len(values) - origin)
+        actuals[i, :steps] = values[origin:origin + steps]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = np.where(actuals != 0, np.abs(errors / actuals), np.nan) * 100
+
+    horizons = []
+    for h in range(horizon):
+        column = errors[:, h]
+        valid = ~np.isnan(column)
+        if not valid.any():
+            break
+        horizons.append({
+            'horizon': h + 1,
+            'n': int(valid.sum()),
+            'mae': float(np.mean(np.abs(column[valid]))),
+            'rmse': float(np.sqrt(np.mean(column[valid] ** 2))),
+            'mape': float(np.nanmean(pct[:, h])) if np.isfinite(pct[:, h]).any() else None
+        })
+
+    return {
+        'order': tuple(order),
+        'origins': len(origins),
+        'window': window or 'expanding',
+        'horizons': horizons
+    }
+
+def backtest_all_metrics(data, targets, orders=None, **kwargs):
+    """Backtest every target, using its chosen order when one is given"""
+    results_dict = {}
+    for target in targets:
+        order = (orders or {}).get(target, DEFAULT_ORDER)
+        try:
+            results_dict[target] = backtest_arima(data[target], order=order, **kwargs)
+        except Exception as e:
+            results_dict[target] = {'error': f"{type(e).__name__}: {str(e)}"}
+    return results_dict
+
+def _forecast_series(entity, target, series, order):
+    """Batch worker: fit one (entity, target) series and return a flat result row"""
+    row = {'entity': entity, 'target': target, 'n_obs': len(series), 'order': str(tuple(order))}
+    try:
+        predictions, mse, _ = train_arima(series, order=order)
+        row.update({'mse': float(mse), 'prediction': float(np.asarray(predictions)[-1]), 'error': None})
+    except Exception as e:
+        row.update({'mse': None, 'prediction': None, 'error': f"{type(e).__name__}: {str(e)}"})
+    return row
+
+def train_batch(data, targets, entity_column='Entity', order=DEFAULT_ORDER,
+                mode='processes', workers=None, max_in_flight=None):
+    """
+    Forecast every (entity, target) series of a long-format data set
+
+    Results are yielded as soon as each series finishes, in completion
+    order. At most max_in_flight series are queued at a time, so memory
+    stays flat however many entities the upload holds.
+
+    Args:
+        data (pd.DataFrame): Date-indexed rows with an entity column and the target columns
+        targets (list): Target columns to forecast per entity
+        entity_column (str): Column identifying the series
+        order (tuple): ARIMA order for every series
+        mode (str): 'serial', 'threads' or 'processes'
+        workers (int): Pool size (defaults to the core count)
+        max_in_flight (int): Series submitted ahead of completed ones (defaults to 4x workers)
+
+    Yields:
+        dict: 'entity', 'target', 'n_obs', 'order', 'mse', 'prediction' and 'error'
+    """
+    def series_iter():
+        for entity, group in data.groupby(entity_column, sort=False, observed=True):
+            group = group.sort_index()
+            for target in targets:
+                yield entity, target, group[target]
+
+    if mode == 'serial':
+        for entity, target, series in series_iter():
+            yield _forecast_series(entity, target, series, order)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    executor_cls = ProcessPoolExecutor if mode == 'processes' else ThreadPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        pending = set()
+        for entity, target, series in series_iter():
+            pending.add(executor.submit(_forecast_series, entity, target, series, order))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
@@ -0,0 +1,77 @@
+import os
+from Techblitz.Visual.Arima import train_batch
+
+# Rows buffered before each Parquet row group is written
+BATCH_ROW_GROUP_SIZE = 1000
+
+BATCH_COLUMNS = ['entity', 'target', 'n_obs', 'order', 'mse', 'prediction', 'error']
+
+class ParquetBatchWriter:
+    """Append result rows to a Parquet file one row group at a time"""
+
+    def __init__(self, path, row_group_size=BATCH_ROW_GROUP_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Batch output requires pyarrow to be installed")
+
+        self._pa = pa
+        self.path = path
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._buffer = []
+        self._schema = pa.schema([
+            ('entity', pa.string()),
+            ('target', pa.string()),
+            ('n_obs', pa.int64()),
+            ('order', pa.string()),
+            ('mse', pa.float64()),
+            ('prediction', pa.float64()),
+            ('error', pa.string())
+        ])
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        columns = {
+            name: [str(row[name]) if name == 'entity' else row[name] for row in self._buffer]
+            for name in BATCH_COLUMNS
+        }
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+def stream_batch_forecast(data, targets, path, entity_column='Entity', **kwargs):
+    """
+    Forecast every series in a long-format data set, writing results to Parquet
+
+    The output file is opened up front, so a missing pyarrow fails before
+    any work starts. The returned generator yields each result row as it
+    completes; the file is complete once the generator is exhausted.
+    Extra keyword arguments go to train_batch.
+    """
+    writer = ParquetBatchWriter(path)
+
+    def rows():
+        try:
+            for row in train_batch(data, targets, entity_column=entity_column, **kwargs):
+                writer.write(row)
+                yield row
+        finally:
+            writer.close()
+
+    return rows()
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+# Points per series in chart data, and the most a client may ask for
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+# Decimal places kept in the JSON
+PRECISION = 6
+
+def describe_columns(values):
+    """
+    Summary statistics of every column in one pass over a 2-D array
+
+    Matches DataFrame.describe() (sample std, linear-interpolated quartiles),
+    ignoring NaNs.
+    """
+    quantiles = np.nanpercentile(values, [0, 25, 50, 75, 100], axis=0)
+    return {
+        'count': np.sum(~np.isnan(values), axis=0),
+        'mean': np.nanmean(values, axis=0),
+        'std': np.nanstd(values, axis=0, ddof=1),
+        'min': quantiles[0],
+        '25%': quantiles[1],
+        '50%': quantiles[2],
+        '75%': quantiles[3],
+        'max': quantiles[4]
+    }
+
+def linear_trends(values):
+    """
+    Least-squares line through every column against the row number (needs two or more rows)
+
+    Closed form for all columns at once; the same fit as
+    np.polyfit(range(n), column, 1) per column.
+
+    Returns:
+        tuple: (slopes, intercepts) arrays, one entry per column
+    """
+    n = values.shape[0]
+    x = np.arange(n, dtype=float)
+    x_centered = x - x.mean()
+    means = values.mean(axis=0)
+    slopes = x_centered @ (values - means) / np.dot(x_centered, x_centered)
+    return slopes, means - slopes * x.mean()
+
+def correlation(data):
+    """Pearson correlation matrix (pairwise-complete when the data has NaNs)"""
+    values = data.to_numpy(dtype=float)
+    if np.isnan(values).any():
+        return data.corr().to_numpy()
+    return np.corrcoef(values, rowvar=False)
+
+def lttb(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Keeps the first and last points and, from each of points - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Preserves
+    the visual shape of a line far better than striding.
+
+    Returns:
+        np.ndarray: Indices of the kept points
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    kept = np.empty(points, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        # Twice the triangle area for every candidate in the bucket
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+def minmax(y, points):
+    """
+    Min/max bucketing: the lowest and highest point of each of points / 2 buckets
+
+    Keeps every spike, so peaks survive however far a series is reduced.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    n = len(y)
+    if points >= n or points < 2:
+        return np.arange(n)
+    buckets = points // 2
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    starts = edges[:-1]
+    bucket_of = np.repeat(np.arange(buckets), np.diff(edges))
+    positions = np.arange(n)
+    kept = []
+    for reduce in (np.fmin, np.fmax):
+        # Each bucket's extreme value, then the first position holding it
+        extremes = reduce.reduceat(y, starts)
+        candidates = np.where(y == extremes[bucket_of], positions, n)
+        kept.append(np.minimum.reduceat(candidates, starts))
+    kept = np.unique(np.concatenate(kept))
+    # All-NaN buckets have no extreme
+    return kept[kept < n]
+
+def _rounded(array):
+    """Rounded plain-Python values, with NaN as None so the JSON stays valid"""
+    rounded = np.round(np.asarray(array, dtype=float), PRECISION)
+    return np.where(np.isnan(rounded), None, rounded).tolist()
+
+def chart_data(data, points=DEFAULT_POINTS, method='lttb'):
+    """
+    Compact JSON-ready chart data for a date-indexed numeric DataFrame
+
+    Statistics, correlations and trends are computed over all rows; each
+    series is reduced to at most points points, so the size of the result
+    depends on the number of columns, not rows.
+
+    Args:
+        data (pd.DataFrame): Numeric columns indexed by date
+        points (int): Points kept per series (capped at MAX_POINTS)
+        method (str): 'lttb' or 'minmax'
+
+    Returns:
+        dict: rows, columns, statistics, correlation, trends and series,
+        with dates as Unix milliseconds
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}. Use one of {', '.join(DOWNSAMPLE_METHODS)}")
+    points = max(3, min(int(points), MAX_POINTS))
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+    columns = list(data.columns)
+    values = data.to_numpy(dtype=float)
+    if values.shape[0] < 2:
+        raise ValueError("At least two rows are needed for chart data")
+    x = pd.DatetimeIndex(data.index).as_unit('ms').asi8
+
+    stats = describe_columns(values)
+    slopes, intercepts = linear_trends(values)
+
+    series = {}
+    x_float = x.astype(float)
+    for i, column in enumerate(columns):
+        y = values[:, i]
+        kept = lttb(x_float, y, points) if method == 'lttb' else minmax(y, points)
+        series[column] = {'x': x[kept].tolist(), 'y': _rounded(y[kept])}
+
+    return {
+        'rows': int(values.shape[0]),
+        'columns': columns,
+        'start': int(x[0]),
+        'end': int(x[-1]),
+        'statistics': {
+            column: {name: int(stat[i]) if name == 'count' else _rounded(stat[i]) for name, stat in stats.items()}
+            for i, column in enumerate(columns)
+        },
+        'correlation': _rounded(correlation(data)),
+        'trends': {
+            column: {'slope': _rounded(slopes[i]), 'intercept': _rounded(intercepts[i])}
+            for i, column in enumerate(columns)
+        },
+        'series': {'method': method, 'points': points, 'data': series}
+    }
@@ -0,0 +1,122 @@
+import pandas as pd
+import hashlib
+import pickle
+import threading
+import os
+from collections import OrderedDict
+
+def model_cache_key(data, targets, order):
+    """Content hash of the normalized data frame, the targets and the model order"""
+    normalized = data.sort_index().reindex(sorted(data.columns), axis=1)
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(normalized, index=True).values.tobytes())
+    digest.update(repr(list(normalized.columns)).encode())
+    digest.update(repr(list(targets)).encode())
+    digest.update(repr(order).encode())
+    return digest.hexdigest()
+
+class ModelCache:
+    """
+    LRU cache of fitted ARIMA results keyed by content hash
+
+    Entries are evicted once either max_entries or max_bytes (pickled size)
+    is exceeded. If disk_dir is set, entries are also written there and
+    reloaded on a memory miss, so they survive restarts; the oldest files
+    are pruned once the directory grows past max_disk_bytes.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024,
+                 disk_dir=None, max_disk_bytes=1024 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if disk_dir and not os.path.exists(disk_dir):
+            os.makedirs(disk_dir)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.pkl')
+
+    def get(self, key):
+        """Return the cached results for key, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), 'rb') as f:
+                    payload = f.read()
+                value = pickle.loads(payload)
+            except Exception as e:
+                print(f"❌ Error reading cached model {key}: {str(e)}")
+            else:
+                self._store(key, value, len(payload))
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Cache value under key, evicting least recently used entries as needed"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.disk_dir:
+            tmp_path = self._disk_path(key) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._disk_path(key))
+            self._prune_disk()
+        self._store(key, value, len(payload))
+
+    def _prune_disk(self):
+        """Remove the least recently written files until the disk tier fits its budget"""
+        files = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.disk_dir, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def _store(self, key, value, size):
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._entries[key]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+
+    def stats(self):
+        """Hit/miss counters and current memory footprint"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
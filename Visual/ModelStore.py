@@ -0,0 +1,196 @@
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+from Techblitz.Visual.Arima import (DEFAULT_ORDER, TARGET_TIMEOUT, TRAINING_MODE, fit_targets,
+                                    resolve_orders, series_fingerprint)
+import hashlib
+import pickle
+import threading
+import time
+import os
+
+# Rows hashed to recognise later uploads of the same data set
+LINEAGE_ROWS = 12
+# Force a full refit after this many incremental updates or this many seconds
+REFIT_EVERY = 12
+REFIT_MAX_AGE = 90 * 24 * 3600
+# Refit when the updated model's MSE exceeds the MSE at its last refit by this factor
+DRIFT_FACTOR = 2.0
+
+def lineage_key(data):
+    """Identify a data set by its columns and first rows, which stay fixed as periods are appended"""
+    head = data.sort_index().head(LINEAGE_ROWS)
+    digest = hashlib.sha256()
+    digest.update(repr(list(data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(head, index=True).values.tobytes())
+    return digest.hexdigest()[:32]
+
+class ModelStore:
+    """
+    On-disk store of fitted ARIMA models keyed by data set lineage and target
+
+    When an upload strictly extends a stored series, the stored results are
+    moved forward over the new observations with the existing parameters
+    instead of being refit. A full refit happens for new or rewritten
+    series, every REFIT_EVERY updates, after REFIT_MAX_AGE, or when the
+    hold-out error drifts past DRIFT_FACTOR times its value at the last
+    refit.
+    """
+
+    def __init__(self, root='model_store'):
+        self.root = root
+        self._lock = threading.Lock()
+        if not os.path.exists(root):
+            os.makedirs(root)
+
+    def _path(self, lineage, target):
+        return os.path.join(self.root, lineage, f'{target}.pkl')
+
+    def load(self, lineage, target):
+        path = self._path(lineage, target)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"❌ Error loading stored model {lineage}/{target}: {str(e)}")
+            return None
+
+    def save(self, lineage, target, entry):
+        path = self._path(lineage, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _entry(self, series, result):
+        """Stored entry for a freshly fitted target"""
+        return {
+            'results': result['model'],
+            'order': result['order'],
+            'n_obs': len(series),
+            'fingerprint': series_fingerprint(series),
+            'fitted_at': time.time(),
+            'updates_since_refit': 0,
+            'baseline_mse': result['mse']
+        }
+
+    def _extend(self, entry, series):
+        """Move stored results forward to the new series' 80/20 split without refitting"""
+        train_size = int(len(series) * 0.8)
+        old_train_size = int(entry['n_obs'] * 0.8)
+        test = series[train_size:]
+
+        results = entry['results']
+        if train_size > old_train_size:
+            results = results.append(series[old_train_size:train_size], refit=False)
+
+        predictions = results.forecast(steps=len(test))
+        mse = mean_squared_error(test, predictions)
+        updated = dict(entry, results=results, n_obs=len(series),
+                       fingerprint=series_fingerprint(series),
+                       updates_since_refit=entry['updates_since_refit'] + 1)
+        return predictions, mse, updated
+
+    def _is_extension(self, entry, series):
+        n_old = entry['n_obs']
+        return (len(series) >= n_old and
+                series_fingerprint(series.iloc[:n_old]) == entry['fingerprint'])
+
+    def _update(self, series, target, lineage):
+        """Stored results moved forward over the new observations, or None if the target needs a refit"""
+        with self._lock:
+            entry = self.load(lineage, target)
+        if entry is None or not self._is_extension(entry, series):
+            return None
+        if (entry['updates_since_refit'] >= REFIT_EVERY or
+                time.time() - entry['fitted_at'] > REFIT_MAX_AGE):
+            return None
+        try:
+            predictions, mse, updated = self._extend(entry, series)
+        except Exception as e:
+            # e.g. an index statsmodels can't extend - refit instead
+            print(f"❌ Incremental update of {target} failed, refitting: {str(e)}")
+            return None
+        if mse > entry['baseline_mse'] * DRIFT_FACTOR:
+            # The error drifted too far
+            return None
+
+        update = 'unchanged' if len(series) == entry['n_obs'] else 'extended'
+        if update != 'unchanged':
+            with self._lock:
+                self.save(lineage, target, updated)
+        return {
+            'predictions': predictions,
+            'mse': mse,
+            'model': updated['results'],
+            'order': updated['order'],
+            'update': update
+        }
+
+    def _train(self, data, targets, lineage, order, mode, timeout):
+        """Update what can be updated, then refit the rest the way Arima.train_all_metrics does"""
+        results_dict, refit = {}, []
+        for target in targets:
+            try:
+                result = self._update(data[target], target, lineage)
+            except Exception as e:
+                result = {'error': f"{type(e).__name__}: {str(e)}"}
+            if result is None:
+                refit.append(target)
+            else:
+                results_dict[target] = result
+
+        if refit:
+            # One order-search budget and one timeout shared by every target refit
+            orders = resolve_orders(data, refit, order, mode)
+            fitted = fit_targets(data, refit, orders, mode, timeout)
+            for target in refit:
+                result = fitted[target]
+                if 'error' not in result:
+                    try:
+                        with self._lock:
+                            self.save(lineage, target, self._entry(data[target], result))
+                    except Exception as e:
+                        print(f"❌ Error storing model {lineage}/{target}: {str(e)}")
+                    result = dict(result, update='refit')
+                results_dict[target] = result
+
+        return {target: results_dict[target] for target in targets}
+
+    def train(self, series, target, lineage, order=DEFAULT_ORDER):
+        """
+        Train a target through the store
+
+        Returns:
+            dict: 'predictions', 'mse', 'model', 'order' and 'update'
+                ('refit', 'extended' or 'unchanged'), plus 'fit_seconds'
+                after a refit, or 'error'
+        """
+        return self._train(series.to_frame(target), [target], lineage, order, 'serial', None)[target]
+
+    def train_all_metrics(self, data, targets, lineage=None, order=DEFAULT_ORDER, mode=None, timeout=None):
+        """
+        Store-backed counterpart of Arima.train_all_metrics; lineage is a caller-chosen data set ID
+
+        mode and timeout apply to the targets that need a refit, as in
+        Arima.train_all_metrics.
+        """
+        mode = mode or TRAINING_MODE
+        timeout = timeout if timeout is not None else TARGET_TIMEOUT
+        if mode not in ('serial', 'threads', 'processes'):
+            raise ValueError(f"Unknown training mode: {mode}")
+        if lineage:
+            # Hash caller-supplied IDs so they are always safe directory names
+            lineage = hashlib.sha256(str(lineage).encode()).hexdigest()[:32]
+        else:
+            lineage = lineage_key(data)
+        results_dict = self._train(data, targets, lineage, order, mode, timeout)
+        for target, result in results_dict.items():
+            if 'error' in result:
+                print(f"❌ {target}: training failed: {result['error']}")
+            else:
+                print(f"{target}: {result['update']} (order {result['order']}, "
+                      f"MSE {result['mse']:.4f})")
+        return results_dict
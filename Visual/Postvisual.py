@@ -1,71 +1,94 @@
 import pandas as pd
+import numpy as np
+from Techblitz.Visual.Render import publish_charts
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
-import os
 
-def visualize_predictions(predictions_data, viz_dir='visualizations'):
-    """Generate and save visualization of predictions"""
+def draw_prediction_comparison(chart_data):
+    """Bar chart of original vs adjusted predictions"""
+    metrics = chart_data['metrics']
+    orig_vals = chart_data['original']
+    adj_vals = chart_data['adjusted']
+
+    fig = plt.figure(figsize=(12, 6))
+    x = range(len(metrics))
+    width = 0.35
+
+    plt.bar([i - width/2 for i in x], orig_vals, width, label='Original', color='skyblue')
+    plt.bar([i + width/2 for i in x], adj_vals, width, label='Adjusted', color='lightcoral')
+
+    plt.xlabel('Metrics')
+    plt.ylabel('Values')
+    plt.title('Original vs Adjusted Predictions')
+    plt.xticks(x, metrics, rotation=45)
+    plt.legend()
+    plt.tight_layout()
+    return fig
+
+def draw_prediction_changes(chart_data):
+    """Bar chart of the percentage change each adjustment made"""
+    metrics = chart_data['metrics']
+    changes = chart_data['change_percent']
+
+    fig = plt.figure(figsize=(10, 6))
+    colors = ['green' if c >= 0 else 'red' for c in changes]
+    plt.bar(metrics, changes, color=colors)
+
+    plt.axhline(y=0, color='black', linestyle='-', alpha=0.2)
+    plt.xlabel('Metrics')
+    plt.ylabel('Change (%)')
+    plt.title('Prediction Changes After Adjustment')
+    plt.xticks(rotation=45)
+
+    for i, v in enumerate(changes):
+        plt.text(i, v, f'{v:.1f}%', ha='center', va='bottom' if v >= 0 else 'top')
+
+    plt.tight_layout()
+    return fig
+
+def visualize_predictions(predictions_data, viz_dir='visualizations', lazy=None):
+    """
+    Generate visualizations of predictions
+
+    Charts are content-addressed, so identical predictions reuse the same
+    files. In lazy mode (RENDER_MODE='lazy') only handles are returned and
+    each chart is rendered when first fetched.
+
+    Returns:
+        dict: Chart name -> file path, or handle in lazy mode
+    """
     try:
-        # Create visualization directory if it doesn't exist
-        if not os.path.exists(viz_dir):
-            os.makedirs(viz_dir)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Comparison Bar Plot
-        plt.figure(figsize=(12, 6))
-        metrics = [p['metric'] for p in predictions_data]
-        orig_vals = [p['original'] for p in predictions_data]
-        adj_vals = [p['adjusted'] for p in predictions_data]
-        
-        x = range(len(metrics))
-        width = 0.35
-        
-        plt.bar([i - width/2 for i in x], orig_vals, width, label='Original', color='skyblue')
-        plt.bar([i + width/2 for i in x], adj_vals, width, label='Adjusted', color='lightcoral')
-        
-        plt.xlabel('Metrics')
-        plt.ylabel('Values')
-        plt.title('Original vs Adjusted Predictions')
-        plt.xticks(x, metrics, rotation=45)
-        plt.legend()
-        plt.tight_layout()
-        
-        comparison_file = f'{viz_dir}/prediction_comparison_{timestamp}.png'
-        plt.savefig(comparison_file)
-        plt.close()
-        
-        # 2. Change Percentage Plot
-        plt.figure(figsize=(10, 6))
-        changes = [p['change_percent'] for p in predictions_data]
-        
-        colors = ['green' if c >= 0 else 'red' for c in changes]
-        plt.bar(metrics, changes, color=colors)
-        
-        plt.axhline(y=0, color='black', linestyle='-', alpha=0.2)
-        plt.xlabel('Metrics')
-        plt.ylabel('Change (%)')
-        plt.title('Prediction Changes After Adjustment')
-        plt.xticks(rotation=45)
-        
-        for i, v in enumerate(changes):
-            plt.text(i, v, f'{v:.1f}%', ha='center', va='bottom' if v >= 0 else 'top')
-        
-        plt.tight_layout()
-        
-        changes_file = f'{viz_dir}/prediction_changes_{timestamp}.png'
-        plt.savefig(changes_file)
-        plt.close()
-        
-        return {
-            'comparison': comparison_file,
-            'changes': changes_file
+        # Only the plotted values, so per-call timestamps don't defeat the cache
+        chart_data = {
+            'metrics': [p['metric'] for p in predictions_data],
+            'original': [p['original'] for p in predictions_data],
+            'adjusted': [p['adjusted'] for p in predictions_data],
+            'change_percent': [p['change_percent'] for p in predictions_data]
         }
-        
+
+        return publish_charts({
+            'comparison': (draw_prediction_comparison, chart_data, {}),
+            'changes': (draw_prediction_changes, chart_data, {})
+        }, viz_dir=viz_dir, lazy=lazy)
+
     except Exception as e:
         print(f"❌ Error generating visualizations: {str(e)}")
         return None
+
+# Adjustment per metric, linear in the parameters (rates as fractions):
+# adjustment = c0 + ci*inflation + cr*interest + cg*growth
+ADJUSTMENT_COEFFICIENTS = {
+    # Revenue affected by growth and inflation
+    'Revenue_Growth': (1.0, -1.0, 0.0, 1.0),
+    # Margin affected by both rates negatively
+    'Profit_Margin': (1.0, -1.0, -1.0, 0.0),
+    # Cash flow affected by all factors
+    'Cash_Flow': (1.0, -0.5, -0.5, 1.0),
+}
+# Unknown metrics are left unchanged
+DEFAULT_COEFFICIENTS = (1.0, 0.0, 0.0, 0.0)
+
 def adjust_predictions(predictions, user_params):
     """
     Adjust predictions based on user parameters
@@ -87,19 +110,9 @@ def adjust_predictions(predictions, user_params):
         adjusted = {}
 
         for metric, value in predictions.items():
-            # Apply different adjustments based on metric type
-            if metric == 'Revenue_Growth':
-                # Revenue affected by growth and inflation
-                adjustment = (1 + growth - inflation)
-            elif metric == 'Profit_Margin':
-                # Margin affected by both rates negatively
-                adjustment = (1 - inflation - interest)
-            elif metric == 'Cash_Flow':
-                # Cash flow affected by all factors
-                adjustment = (1 + growth - (inflation + interest)/2)
-            else:
-                # Default adjustment if metric unknown
-                adjustment = 1.0
+            # Apply the metric's adjustment (shared with adjust_scenarios)
+            c0, ci, cr, cg = ADJUSTMENT_COEFFICIENTS.get(metric, DEFAULT_COEFFICIENTS)
+            adjustment = c0 + ci * inflation + cr * interest + cg * growth
 
             # Apply adjustment and store
             adjusted[metric] = float(value) * adjustment
@@ -109,7 +122,54 @@ def adjust_predictions(predictions, user_params):
     except Exception as e:
         print(f"❌ Error in adjust_predictions: {str(e)}")
         return None
-    
+
+def scenario_grid(inflation_rates, interest_rates, growth_factors):
+    """Cartesian product of parameter values as an (n, 3) array of (inflation, interest, growth)"""
+    mesh = np.meshgrid(
+        np.asarray(inflation_rates, dtype=float),
+        np.asarray(interest_rates, dtype=float),
+        np.asarray(growth_factors, dtype=float),
+        indexing='ij'
+    )
+    return np.stack([m.ravel() for m in mesh], axis=1)
+
+def adjust_scenarios(predictions, scenarios):
+    """
+    Adjust predictions for many scenarios at once
+
+    Args:
+        predictions (dict): Original prediction for each metric
+        scenarios (array-like): (n, 3) rows of (inflation %, interest %, growth factor)
+
+    Returns:
+        dict: 'metrics', 'original' (m,), 'adjusted' (n, m) and 'change_percent' (n, m)
+    """
+    scenarios = np.asarray(scenarios, dtype=float).reshape(-1, 3)
+    metrics = list(predictions)
+    original = np.array([float(predictions[m]) for m in metrics])
+
+    # (n, 4) design matrix [1, inflation, interest, growth] against (4, m) coefficients
+    design = np.column_stack([
+        np.ones(len(scenarios)),
+        scenarios[:, 0] / 100,
+        scenarios[:, 1] / 100,
+        scenarios[:, 2]
+    ])
+    coefficients = np.array([
+        ADJUSTMENT_COEFFICIENTS.get(m, DEFAULT_COEFFICIENTS) for m in metrics
+    ]).T
+
+    adjusted = (design @ coefficients) * original
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_percent = (adjusted - original) / original * 100
+
+    return {
+        'metrics': metrics,
+        'original': original,
+        'adjusted': adjusted,
+        'change_percent': change_percent
+    }
+
 def format_predictions(original_pred, adjusted_pred, target):
     """Format prediction results for display"""
     return {
@@ -119,5 +179,3 @@ def format_predictions(original_pred, adjusted_pred, target):
         'change_percent': ((adjusted_pred - original_pred) / original_pred) * 100,
         'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
-
-# ...existing code for get_user_input() and adjust_predictions()...
\ No newline at end of file
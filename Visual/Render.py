@@ -0,0 +1,263 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+import hashlib
+import json
+import pickle
+import re
+import threading
+import os
+
+# 'eager' renders charts during the request, 'lazy' returns handles rendered on first fetch
+RENDER_MODE = os.getenv('RENDER_MODE', 'eager')
+# Output format ('png', 'svg' or 'webp') and DPI override for every chart (None keeps chart defaults)
+CHART_FORMAT = os.getenv('CHART_FORMAT', 'png')
+CHART_DPI = int(os.getenv('CHART_DPI')) if os.getenv('CHART_DPI') else None
+CHART_WORKERS = 2
+# Bounds on the rendered files kept per output directory
+MAX_CHART_FILES = 500
+MAX_CHART_BYTES = 200 * 1024 * 1024
+# Seconds a fetch waits for its chart to render
+RENDER_TIMEOUT = 60
+
+MIME_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'webp': 'image/webp'
+}
+
+_HANDLE_PATTERN = re.compile(r'^[A-Za-z0-9_]+_[0-9a-f]{20}\.(png|svg|webp)$')
+
+def _content_hash(data):
+    """Hash chart input; data frames by content, everything else as canonical JSON"""
+    digest = hashlib.sha256()
+    if isinstance(data, pd.DataFrame):
+        digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+        digest.update(repr(list(data.columns)).encode())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+def _render_chart(draw, data, path, fmt, savefig_kwargs):
+    """Worker entry point: draw one chart and write it atomically to path"""
+    matplotlib.use('Agg')
+    fig = draw(data)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        fig.savefig(tmp_path, format=fmt, **savefig_kwargs)
+        os.replace(tmp_path, path)
+    finally:
+        plt.close(fig)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+class ChartRenderer:
+    """
+    Content-addressed chart store that renders on demand
+
+    register() only hashes the chart input and returns a handle. The image
+    is drawn in a background process pool the first time get() asks for it,
+    and reused for any later request with the same input, DPI and format.
+    The output directory is trimmed oldest-first past its file and byte
+    limits. Specs registered with persist=True are also written under
+    <viz_dir>/.specs, so any worker process sharing the directory can
+    render a handle another one issued.
+    """
+
+    def __init__(self, viz_dir='visualizations', workers=CHART_WORKERS,
+                 max_files=MAX_CHART_FILES, max_bytes=MAX_CHART_BYTES, max_specs=1024):
+        self.viz_dir = viz_dir
+        self.workers = workers
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.max_specs = max_specs
+        self._specs = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def path(self, handle):
+        """File path for a handle (which ends in its format)"""
+        return os.path.join(self.viz_dir, handle)
+
+    def _spec_path(self, handle):
+        return os.path.join(self.viz_dir, '.specs', handle + '.pickle')
+
+    def _save_spec(self, handle, spec):
+        """Write a spec for other processes, keeping at most max_specs on disk"""
+        path = self._spec_path(handle)
+        if os.path.exists(path):
+            os.utime(path)
+            return
+        spec_dir = os.path.dirname(path)
+        os.makedirs(spec_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(spec, f)
+        os.replace(tmp_path, path)
+
+        specs = []
+        for name in os.listdir(spec_dir):
+            if name.endswith('.pickle'):
+                try:
+                    specs.append((os.stat(os.path.join(spec_dir, name)).st_mtime, name))
+                except OSError:
+                    continue
+        for _, name in sorted(specs)[:max(0, len(specs) - self.max_specs)]:
+            try:
+                os.remove(os.path.join(spec_dir, name))
+            except OSError:
+                continue
+
+    def _load_spec(self, handle):
+        """Spec written by any process sharing viz_dir, or None"""
+        try:
+            with open(self._spec_path(handle), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def register(self, kind, draw, data, dpi=None, fmt=None, persist=False, **savefig_kwargs):
+        """
+        Record a chart and return its handle without rendering it
+
+        Args:
+            kind (str): Chart name, used as the file name prefix
+            draw (callable): Module-level function taking data and returning a Figure
+            data: Chart input (data frame or JSON-serialisable)
+            dpi (int): Resolution, overridden by CHART_DPI when set
+            fmt (str): 'png', 'svg' or 'webp' (defaults to CHART_FORMAT)
+            persist (bool): Also store the spec under viz_dir for other worker processes
+
+        Returns:
+            str: Handle of the form '<kind>_<hash>.<fmt>'
+        """
+        fmt = (fmt or CHART_FORMAT).lower()
+        if fmt not in MIME_TYPES:
+            raise ValueError(f"Unsupported chart format: {fmt}")
+        dpi = CHART_DPI or dpi
+        if dpi:
+            savefig_kwargs['dpi'] = dpi
+
+        key = _content_hash(data) + json.dumps([kind, fmt, savefig_kwargs], sort_keys=True)
+        handle = f'{kind}_{hashlib.sha256(key.encode()).hexdigest()[:20]}.{fmt}'
+        spec = (draw, data, fmt, savefig_kwargs)
+        with self._lock:
+            self._specs[handle] = spec
+            self._specs.move_to_end(handle)
+            if len(self._specs) > self.max_specs:
+                self._specs.popitem(last=False)
+            if persist:
+                self._save_spec(handle, spec)
+        return handle
+
+    def submit(self, handle):
+        """Start rendering a handle in the background; returns the future or None"""
+        with self._lock:
+            if handle in self._pending:
+                return self._pending[handle]
+            spec = self._specs.get(handle) or self._load_spec(handle)
+            if spec is None:
+                return None
+            if not os.path.exists(self.viz_dir):
+                os.makedirs(self.viz_dir, exist_ok=True)
+            draw, data, fmt, savefig_kwargs = spec
+            future = self._pool().submit(
+                _render_chart, draw, data, self.path(handle), fmt, savefig_kwargs
+            )
+            self._pending[handle] = future
+        future.add_done_callback(lambda _: self._finish(handle))
+        return future
+
+    def _finish(self, handle):
+        with self._lock:
+            self._pending.pop(handle, None)
+        self._evict()
+
+    def get(self, handle, timeout=RENDER_TIMEOUT):
+        """Path of the rendered chart, rendering it first if needed; None for unknown handles"""
+        if not _HANDLE_PATTERN.match(handle):
+            return None
+        path = self.path(handle)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+
+        future = self.submit(handle)
+        if future is None:
+            return None
+        return future.result(timeout=timeout)
+
+    def _evict(self):
+        """Delete least recently used charts until the directory fits its limits"""
+        if not os.path.exists(self.viz_dir):
+            return
+        files = []
+        for name in os.listdir(self.viz_dir):
+            if name.rsplit('.', 1)[-1] in MIME_TYPES:
+                path = os.path.join(self.viz_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        count = len(files)
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if count <= self.max_files and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+_renderers = {}
+_renderers_lock = threading.Lock()
+
+def get_renderer(viz_dir='visualizations'):
+    """Shared renderer for an output directory"""
+    with _renderers_lock:
+        if viz_dir not in _renderers:
+            _renderers[viz_dir] = ChartRenderer(viz_dir)
+        return _renderers[viz_dir]
+
+def publish_charts(charts, viz_dir='visualizations', lazy=None):
+    """
+    Register charts and, unless rendering lazily, render them now
+
+    Args:
+        charts (dict): name -> (draw, data, savefig kwargs)
+        viz_dir (str): Output directory
+        lazy (bool): Return handles without rendering (defaults to RENDER_MODE == 'lazy')
+
+    Returns:
+        dict: name -> handle (lazy) or file path (eager)
+    """
+    lazy = RENDER_MODE == 'lazy' if lazy is None else lazy
+    renderer = get_renderer(viz_dir)
+    handles = {
+        name: renderer.register(name, draw, data, persist=lazy, **kwargs)
+        for name, (draw, data, kwargs) in charts.items()
+    }
+    if lazy:
+        return handles
+
+    futures = [
+        renderer.submit(handle) for handle in handles.values()
+        if not os.path.exists(renderer.path(handle))
+    ]
+    for future in futures:
+        if future is not None:
+            future.result(timeout=RENDER_TIMEOUT)
+    return {name: renderer.path(handle) for name, handle in handles.items()}
@@ -2,14 +2,81 @@ from flask import request
 import io
 import pandas as pd
 import numpy as np
+from Techblitz.Visual.Render import publish_charts
 import matplotlib.pyplot as plt
 import seaborn as sns
-import tabula
+from Techblitz.PdfTables import pdf_extractor
+from Techblitz.Results import results_store
+from Techblitz.Visual.ChartData import DEFAULT_POINTS, chart_data, linear_trends
 import os
-from datetime import datetime
 
-def load_and_prepare_data(file_data=None):
-    """Load financial data from uploaded CSV or PDF file and save visualizations"""
+def draw_timeseries(data):
+    """Line chart of every metric over time"""
+    fig = plt.figure(figsize=(15, 10))
+    for column in data.columns:
+        plt.plot(data.index, data[column], label=column, marker='o')
+    plt.title('Financial Metrics Over Time', fontsize=14, pad=20)
+    plt.xlabel('Date', fontsize=12)
+    plt.ylabel('Value', fontsize=12)
+    plt.legend(fontsize=10, bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.grid(True, alpha=0.3)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    return fig
+
+def draw_correlation(data):
+    """Lower-triangle correlation heatmap"""
+    fig = plt.figure(figsize=(10, 8))
+    corr = data.corr()
+    mask = np.triu(np.ones_like(corr, dtype=bool))
+    sns.heatmap(corr, 
+               mask=mask,
+               annot=True, 
+               cmap='coolwarm', 
+               center=0,
+               fmt='.2f',
+               square=True,
+               linewidths=1)
+    plt.title('Correlation Between Metrics', fontsize=14, pad=20)
+    plt.tight_layout()
+    return fig
+
+def draw_metric_trends(data):
+    """Per-metric panels with points and a linear trend line"""
+    fig, axes = plt.subplots(2, 3, figsize=(15, 10))
+    fig.suptitle('Individual Metric Analysis', fontsize=16, y=1.02)
+    
+    # Trend lines for every column in one fit
+    x = np.arange(len(data.index))
+    slopes, intercepts = linear_trends(data.to_numpy(dtype=float))
+    
+    for idx, column in enumerate(data.columns):
+        row = idx // 3
+        col = idx % 3
+        
+        # Plot with both line and points
+        sns.lineplot(data=data, x=data.index, y=column, ax=axes[row, col])
+        axes[row, col].scatter(data.index, data[column], color='red', alpha=0.5)
+        
+        # Add trend line
+        axes[row, col].plot(data.index, slopes[idx] * x + intercepts[idx], 
+                          "r--", alpha=0.8, label='Trend')
+        
+        axes[row, col].set_title(f'{column} Trend', fontsize=12)
+        axes[row, col].tick_params(axis='x', rotation=45)
+        axes[row, col].grid(True, alpha=0.3)
+        axes[row, col].legend()
+    
+    plt.tight_layout()
+    return fig
+
+def load_and_prepare_data(file_data=None, data_only=False, points=DEFAULT_POINTS, method='lttb'):
+    """
+    Load financial data from uploaded CSV or PDF file and publish its visualizations
+
+    With data_only, nothing is rendered or stored; the second value is
+    chart_data() for client-side charting, downsampled to points per series.
+    """
     try:
         if file_data is None:
             raise ValueError("No file data provided")
@@ -26,10 +93,10 @@ def load_and_prepare_data(file_data=None):
         if is_csv:
             data = pd.read_csv(file_obj)
         elif is_pdf:
-            tables = tabula.read_pdf(file_obj, pages='all')
-            if not tables:
-                raise ValueError("No tables found in PDF")
-            data = tables[0]
+            data = pdf_extractor.extract(file_data, [
+                'Date', 'Inflation_Rate', 'Interest_Rate',
+                'Revenue_Growth', 'Profit_Margin', 'Cash_Flow'
+            ])
         else:
             raise ValueError("Unsupported file format. Please use CSV or PDF")
 
@@ -47,83 +114,33 @@ def load_and_prepare_data(file_data=None):
         data = data.set_index('Date')
         data = data.sort_index()
         
+        if data_only:
+            return data, chart_data(data, points=points, method=method)
+        
         # Create visualization directory
         viz_dir = 'visualizations'
         if not os.path.exists(viz_dir):
             os.makedirs(viz_dir)
         
-        # Generate timestamp for filenames
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # 1. Time Series Plot
-        plt.figure(figsize=(15, 10))
-        for column in data.columns:
-            plt.plot(data.index, data[column], label=column, marker='o')
-        plt.title('Financial Metrics Over Time', fontsize=14, pad=20)
-        plt.xlabel('Date', fontsize=12)
-        plt.ylabel('Value', fontsize=12)
-        plt.legend(fontsize=10, bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(f'{viz_dir}/timeseries_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 2. Correlation Heatmap
-        plt.figure(figsize=(10, 8))
-        mask = np.triu(np.ones_like(data.corr(), dtype=bool))
-        sns.heatmap(data.corr(), 
-                   mask=mask,
-                   annot=True, 
-                   cmap='coolwarm', 
-                   center=0,
-                   fmt='.2f',
-                   square=True,
-                   linewidths=1)
-        plt.title('Correlation Between Metrics', fontsize=14, pad=20)
-        plt.tight_layout()
-        plt.savefig(f'{viz_dir}/correlation_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        # 3. Individual Metrics Analysis
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-        fig.suptitle('Individual Metric Analysis', fontsize=16, y=1.02)
-        
-        for idx, column in enumerate(data.columns):
-            row = idx // 3
-            col = idx % 3
-            
-            # Plot with both line and points
-            sns.lineplot(data=data, x=data.index, y=column, ax=axes[row, col])
-            axes[row, col].scatter(data.index, data[column], color='red', alpha=0.5)
-            
-            # Add trend line
-            z = np.polyfit(range(len(data.index)), data[column], 1)
-            p = np.poly1d(z)
-            axes[row, col].plot(data.index, p(range(len(data.index))), 
-                              "r--", alpha=0.8, label='Trend')
-            
-            axes[row, col].set_title(f'{column} Trend', fontsize=12)
-            axes[row, col].tick_params(axis='x', rotation=45)
-            axes[row, col].grid(True, alpha=0.3)
-            axes[row, col].legend()
-        
-        plt.tight_layout()
-        plt.savefig(f'{viz_dir}/metrics_{timestamp}.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        # Charts are rendered now, or on first fetch in lazy mode
+        chart_files = publish_charts({
+            'timeseries': (draw_timeseries, data, {'dpi': 300, 'bbox_inches': 'tight'}),
+            'correlation': (draw_correlation, data, {'dpi': 300, 'bbox_inches': 'tight'}),
+            'metrics': (draw_metric_trends, data, {'dpi': 300, 'bbox_inches': 'tight'})
+        }, viz_dir=viz_dir)
         
-        # Create summary statistics
+        # Store summary statistics, one row per column
         stats_summary = data.describe()
-        stats_file = f'{viz_dir}/statistics_{timestamp}.csv'
-        stats_summary.to_csv(stats_file)
+        stats_id = results_store.record('statistics', [
+            {'metric': column, **{stat: float(value) for stat, value in stats_summary[column].items()}}
+            for column in stats_summary.columns
+        ])
         
-        # Create visualization files dictionary
+        # Create visualization files dictionary; statistics is a result ID for /api/results
         visualization_files = {
-            'timeseries': f'timeseries_{timestamp}.png',
-            'correlation': f'correlation_{timestamp}.png',
-            'metrics': f'metrics_{timestamp}.png',
-            'statistics': f'statistics_{timestamp}.csv'
+            name: os.path.basename(path) for name, path in chart_files.items()
         }
+        visualization_files['statistics'] = stats_id
         
         return data, visualization_files
 
@@ -146,4 +163,4 @@ def validate_data(data):
         return True, "Data validation successful"
         
     except Exception as e:
-        return False, f"Validation error: {str(e)}"
\ No newline at end of file
+        return False, f"Validation error: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Load-test the /Rmodel chatbot with many concurrent clients, offline
+
+    python benchmarks/loadtest.py --clients 64 --requests 500 --latency 0.5
+    python benchmarks/loadtest.py --modes async --concurrency 16 --max-queue 32
+
+The Mistral model is replaced by the stub with the given latency and the
+Chroma store is an empty scratch directory, so only the serving path is
+measured. Each mode ('sync' = blocking invoke per request thread, 'async' =
+the LLM gateway) reports throughput, latency percentiles, status codes
+and how many model calls were actually made.
+"""
+import argparse
+import importlib
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_data  # noqa: E402
+from run import _install_package_alias  # noqa: E402
+
+_install_package_alias()
+
+def run_load(client, prompts, clients):
+    """Send every prompt from a pool of client threads; returns latencies, status counts and wall time"""
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    next_index = [0]
+
+    def worker():
+        while True:
+            with lock:
+                index = next_index[0]
+                next_index[0] += 1
+            if index >= len(prompts):
+                return
+            start = time.perf_counter()
+            # A fresh session per request, as for first-time visitors
+            response = client.post('/Rmodel', json={'prompt': prompts[index], 'session_id': f'load_{index}'})
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - start
+
+def summarize(latencies, statuses, wall, model_calls):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'wall_s': round(wall, 3),
+        'throughput_per_s': round(len(latencies) / wall, 1) if wall > 0 else None,
+        'p50_s': round(statistics.median(latencies), 3),
+        'p95_s': round(latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))], 3),
+        'max_s': round(latencies[-1], 3),
+        'statuses': dict(statuses),
+        'model_calls': model_calls
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='sync,async', help='Comma-separated: sync, async')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent client threads')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5, help='Stub model latency (s)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Gateway concurrent model calls')
+    parser.add_argument('--max-queue', type=int, default=64, help='Gateway calls allowed to wait')
+    parser.add_argument('--timeout', type=float, default=30, help='Gateway timeout (s)')
+    parser.add_argument('--cache', action='store_true', help='Keep the semantic response cache enabled')
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix='techblitz_load_')
+    os.environ['VECTOR_DB_PATH'] = os.path.join(scratch, 'db')
+    try:
+        retrieve = importlib.import_module('retrieve')
+        stub_llm = importlib.import_module('stub_llm')
+        gateway = importlib.import_module('gateway')
+        Rmodel = importlib.import_module('Rmodel')
+        client = Rmodel.app.test_client()
+        prompts = synthetic_data.questions(args.requests)
+
+        for mode in args.modes.split(','):
+            retrieve.llm = stub_llm.StubChatModel(latency=args.latency)
+            retrieve.conversations.clear()
+            if not args.cache:
+                retrieve.response_cache = None
+            retrieve.llm_gateway = gateway.LLMGateway(
+                lambda: retrieve.llm,
+                concurrency=args.concurrency,
+                max_queue=args.max_queue,
+                timeout=args.timeout
+            ) if mode == 'async' else None
+
+            latencies, statuses, wall = run_load(client, prompts, args.clients)
+            result = summarize(latencies, statuses, wall, retrieve.llm.calls)
+            print(f"{mode:6} " + ' '.join(f"{key}={value}" for key, value in result.items()), flush=True)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
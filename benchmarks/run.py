@@ -0,0 +1,335 @@
+"""
+Benchmark the forecast, visualization and RAG hot paths
+
+    python benchmarks/run.py --sizes small,medium --repeat 5
+    python benchmarks/run.py --save-baseline          # record benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+Every benchmark runs in a scratch working directory on seeded synthetic
+data, with a stub in place of the Mistral LLM. Latency (median/p95),
+throughput and peak traced memory are written to benchmarks/results/.
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic_data  # noqa: E402
+
+TARGETS = ['Revenue_Growth', 'Profit_Margin', 'Cash_Flow']
+
+def _install_package_alias():
+    """Make the checkout importable as Techblitz whatever its directory is called"""
+    if 'Techblitz' not in sys.modules:
+        package = types.ModuleType('Techblitz')
+        package.__path__ = [REPO_ROOT]
+        sys.modules['Techblitz'] = package
+    # Rag modules import each other by bare name
+    sys.path.insert(0, os.path.join(REPO_ROOT, 'Rag'))
+
+def measure(func, repeat, items=1):
+    """
+    Time func() repeat times, then once more under tracemalloc for peak memory
+
+    func receives the run index so it can vary its input (e.g. to miss caches).
+    """
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(repeat)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        'repeat': repeat,
+        'median_s': median,
+        'p95_s': timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        'min_s': timings[0],
+        'throughput_per_s': items / median if median > 0 else None,
+        'peak_mb': peak / (1024 * 1024)
+    }
+
+# --- benchmarks: each takes (size, repeat) and returns a measure() result ---
+
+def bench_process_financial_data(size, repeat):
+    Pred = importlib.import_module('Techblitz.Pred')
+    client = Pred.app.test_client()
+    rows = synthetic_data.ROW_SIZES[size]
+
+    def run(i):
+        # A new seed per run so the model cache never hits
+        response = client.post('/api/analyze', data={
+            'file': (io.BytesIO(synthetic_data.financial_csv(rows, seed=1000 + i)), 'data.csv'),
+            'inflation_rate': '2', 'interest_rate': '3', 'growth_factor': '1.1'
+        }, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(response.get_data(as_text=True))
+
+    return measure(run, repeat)
+
+def bench_train_all_metrics(size, repeat):
+    Arima = importlib.import_module('Techblitz.Visual.Arima')
+    Ingest = importlib.import_module('Techblitz.Ingest')
+    data = Ingest.load_financial_data(io.BytesIO(synthetic_data.financial_csv(synthetic_data.ROW_SIZES[size])))
+    return measure(lambda i: Arima.train_all_metrics(data, TARGETS), repeat, items=len(TARGETS))
+
+def bench_adjust_predictions(size, repeat):
+    import pandas as pd
+    Postvisual = importlib.import_module('Techblitz.Visual.Postvisual')
+    calls = {'small': 100, 'medium': 1000, 'large': 10000}[size]
+    user_params = pd.DataFrame([{'Inflation_Rate': 2.0, 'Interest_Rate': 3.0, 'Growth_Factor': 1.1}])
+    predictions = {'Revenue_Growth': 5.0, 'Profit_Margin': 12.0, 'Cash_Flow': 100.0}
+
+    def run(i):
+        for _ in range(calls):
+            Postvisual.adjust_predictions(predictions, user_params)
+
+    return measure(run, repeat, items=calls)
+
+def bench_visualize_predictions(size, repeat):
+    Postvisual = importlib.import_module('Techblitz.Visual.Postvisual')
+    predictions = [
+        {'metric': t, 'original': 10.0 + k, 'adjusted': 11.0 + k, 'change_percent': 5.0 + k}
+        for k, t in enumerate(TARGETS)
+    ]
+
+    def run(i):
+        # Fresh directory per run so every chart is really rendered
+        Postvisual.visualize_predictions(predictions, viz_dir=f'viz_post_{size}_{i}', lazy=False)
+
+    return measure(run, repeat)
+
+def bench_load_and_prepare_data(size, repeat):
+    Pred = importlib.import_module('Techblitz.Pred')
+    previsual = importlib.import_module('Techblitz.Visual.previsual')
+    rows = synthetic_data.ROW_SIZES[size]
+
+    def run(i):
+        payload = synthetic_data.financial_csv(rows, seed=2000 + i)
+        with Pred.app.test_request_context(content_type='text/csv'):
+            data, files = previsual.load_and_prepare_data(payload)
+        if data is None:
+            raise RuntimeError("load_and_prepare_data failed")
+
+    return measure(run, repeat)
+
+def bench_chart_data(size, repeat):
+    Pred = importlib.import_module('Techblitz.Pred')
+    previsual = importlib.import_module('Techblitz.Visual.previsual')
+    rows = synthetic_data.ROW_SIZES[size]
+
+    def run(i):
+        payload = synthetic_data.financial_csv(rows, seed=2000 + i)
+        with Pred.app.test_request_context(content_type='text/csv'):
+            data, chart = previsual.load_and_prepare_data(payload, data_only=True)
+        if data is None:
+            raise RuntimeError("load_and_prepare_data failed")
+
+    return measure(run, repeat)
+
+def bench_embed_ingestion(size, repeat):
+    Embed = importlib.import_module('Embed')
+    paths = synthetic_data.write_documents(f'docs_{size}', synthetic_data.DOCUMENT_SIZES[size])
+
+    def run(i):
+        db_path = f'chroma_{size}_{i}'
+        Embed.embed_corpus(paths, db_path=db_path)
+        shutil.rmtree(db_path, ignore_errors=True)
+
+    return measure(run, repeat, items=len(paths))
+
+def bench_generate_response(size, repeat):
+    retrieve = importlib.import_module('retrieve')
+    stub_llm = importlib.import_module('stub_llm')
+    retrieve.llm = stub_llm.StubChatModel(latency=0.0)
+    # Measure the full path; bench_response_cache covers cached answers
+    retrieve.response_cache = None
+    prompts = synthetic_data.questions({'small': 10, 'medium': 100, 'large': 1000}[size])
+
+    def run(i):
+        retrieve.conversations.clear()
+        for n, prompt in enumerate(prompts):
+            retrieve.generate_response(prompt, session_id=f'session_{n % 10}')
+
+    return measure(run, repeat, items=len(prompts))
+
+def bench_stream_response(size, repeat):
+    retrieve = importlib.import_module('retrieve')
+    stub_llm = importlib.import_module('stub_llm')
+    retrieve.llm = stub_llm.StubChatModel(latency=0.05)
+    retrieve.response_cache = None
+    prompts = synthetic_data.questions({'small': 10, 'medium': 100, 'large': 1000}[size])
+    first_tokens = []
+
+    def run(i):
+        retrieve.conversations.clear()
+        for n, prompt in enumerate(prompts):
+            start = time.perf_counter()
+            for k, _ in enumerate(retrieve.stream_response(prompt, session_id=f'session_{n % 10}')):
+                if k == 0:
+                    first_tokens.append(time.perf_counter() - start)
+
+    result = measure(run, repeat, items=len(prompts))
+    result['first_token_median_s'] = statistics.median(first_tokens)
+    return result
+
+def bench_response_cache(size, repeat):
+    retrieve = importlib.import_module('retrieve')
+    stub_llm = importlib.import_module('stub_llm')
+    response_cache = importlib.import_module('response_cache')
+    retrieve.llm = stub_llm.StubChatModel(latency=0.05)
+    prompts = synthetic_data.questions({'small': 10, 'medium': 100, 'large': 1000}[size])
+
+    def run(i):
+        # Each prompt is asked twice in fresh sessions: one miss, then one hit
+        retrieve.response_cache = response_cache.SemanticCache()
+        retrieve.conversations.clear()
+        for n, prompt in enumerate(prompts + prompts):
+            retrieve.generate_response(prompt, session_id=f'session_{i}_{n}')
+
+    return measure(run, repeat, items=2 * len(prompts))
+
+def bench_vector_store(size, repeat):
+    vector_store = importlib.import_module('vector_store')
+    count = synthetic_data.EMBEDDING_SIZES[size]
+    vectors = synthetic_data.embeddings(count)
+    queries = synthetic_data.embeddings(100, seed=1)
+    store = vector_store.QuantizedStore(f'vectors_{size}')
+    for start in range(0, count, 1000):
+        ids = [f'chunk_{n}' for n in range(start, min(start + 1000, count))]
+        store.upsert(ids, vectors[start:start + 1000], documents=ids)
+    store.build_index()
+
+    def run(i):
+        store.query(queries.tolist(), n_results=4)
+
+    result = measure(run, repeat, items=len(queries))
+    result['recall_at_4'] = vector_store.recall_at_k(store, queries, k=4)
+    result['nprobe'] = store.header.get('nprobe')
+    result['store_mb'] = store.memory_bytes() / (1024 * 1024)
+    result['float32_mb'] = vectors.nbytes / (1024 * 1024)
+    return result
+
+def bench_finance_gate(size, repeat):
+    retrieve = importlib.import_module('retrieve')
+    prompts = synthetic_data.questions({'small': 1000, 'medium': 10000, 'large': 100000}[size])
+
+    def run(i):
+        for prompt in prompts:
+            retrieve.finance_gate.is_finance(prompt)
+
+    return measure(run, repeat, items=len(prompts))
+
+BENCHMARKS = {
+    'process_financial_data': bench_process_financial_data,
+    'train_all_metrics': bench_train_all_metrics,
+    'adjust_predictions': bench_adjust_predictions,
+    'visualize_predictions': bench_visualize_predictions,
+    'load_and_prepare_data': bench_load_and_prepare_data,
+    'chart_data': bench_chart_data,
+    'embed_ingestion': bench_embed_ingestion,
+    'generate_response': bench_generate_response,
+    'response_cache': bench_response_cache,
+    'stream_response': bench_stream_response,
+    'finance_gate': bench_finance_gate,
+    'vector_store': bench_vector_store,
+}
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline and return the regressed benchmark keys"""
+    regressions = []
+    print(f"\n{'benchmark':45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, current in results['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(key)
+        if not before or 'median_s' not in before or 'median_s' not in current:
+            continue
+        change = (current['median_s'] - before['median_s']) / before['median_s']
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"{key:45} {before['median_s']:10.4f} {current['median_s']:10.4f} {change:+8.1%}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help='Comma-separated benchmark names (default: all)')
+    parser.add_argument('--sizes', default='small,medium', help='Comma-separated: small, medium, large')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='Baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Median slowdown flagged as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Also write benchmarks/baseline.json')
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+    sizes = args.sizes.split(',')
+
+    _install_package_alias()
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'benchmarks': {}
+    }
+
+    scratch = tempfile.mkdtemp(prefix='techblitz_bench_')
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        for name in names:
+            for size in sizes:
+                key = f'{name}[{size}]'
+                print(f"▶ {key}", flush=True)
+                try:
+                    results['benchmarks'][key] = BENCHMARKS[name](size, args.repeat)
+                except Exception as e:
+                    print(f"❌ {key} failed: {type(e).__name__}: {str(e)}")
+                    results['benchmarks'][key] = {'error': f"{type(e).__name__}: {str(e)}"}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    output = args.output or os.path.join(BENCH_DIR, 'results', f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.save_baseline:
+        with open(os.path.join(BENCH_DIR, 'baseline.json'), 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Report where the Flask services spend their startup time
+
+    python benchmarks/startup.py                      # both services
+    python benchmarks/startup.py --service analysis --preload statsmodels,charts
+
+Each service is imported in a fresh interpreter under `python -X importtime`.
+The report lists the packages with the largest cumulative import cost,
+followed by the initialisation steps that Startup.py records (lazy imports,
+client and store creation, and preloads).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+
+# Child process: make the checkout importable like run.py does, import the app, print its report
+CHILD = """
+import json, os, sys, types
+root = sys.argv[1]
+package = types.ModuleType('Techblitz')
+package.__path__ = [root]
+sys.modules['Techblitz'] = package
+sys.path.insert(0, os.path.join(root, 'Rag'))
+import importlib
+importlib.import_module(sys.argv[2])
+print('STARTUP_REPORT ' + json.dumps(sys.modules['Techblitz.Startup'].report()))
+"""
+
+SERVICES = {
+    'analysis': 'Techblitz.Pred',
+    'chatbot': 'Rmodel'
+}
+
+def profile(module, preload):
+    """Import module in a fresh interpreter; returns wall time, import costs and the startup report"""
+    env = dict(os.environ, PRELOAD=preload, PDF_WARM_UP='0')
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD, REPO_ROOT, module],
+        capture_output=True, text=True, env=env, cwd=REPO_ROOT
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import failed')
+
+    # importtime lines: "import time: self [us] | cumulative | <indent>name"
+    packages = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith(' ') and not name.startswith('  '):
+            # One leading space marks a top-level import; nested costs are already included
+            packages[name.strip().split('.')[0]] += int(cumulative)
+
+    report = {}
+    for line in proc.stdout.splitlines():
+        if line.startswith('STARTUP_REPORT '):
+            report = json.loads(line[len('STARTUP_REPORT '):])
+    return wall, packages, report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--service', choices=sorted(SERVICES), help='Profile one service (default: both)')
+    parser.add_argument('--preload', default='', help='PRELOAD value for the child, e.g. all')
+    parser.add_argument('--top', type=int, default=15, help='Packages listed')
+    args = parser.parse_args(argv)
+
+    for service in [args.service] if args.service else sorted(SERVICES):
+        try:
+            wall, packages, report = profile(SERVICES[service], args.preload)
+        except RuntimeError as e:
+            print(f"❌ {service} failed to import: {str(e)}")
+            continue
+        print(f"\n▶ {service} ({SERVICES[service]}): {wall:.2f}s to start, "
+              f"{report.get('modules_loaded', '?')} modules loaded")
+        print(f"  {'package':30} {'import (s)':>10}")
+        for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {name:30} {micros / 1e6:>10.3f}")
+        if report.get('steps'):
+            print(f"  {'step':30} {'time (s)':>10}")
+            for step in report['steps']:
+                print(f"  {step['name']:30} {step['seconds']:>10.3f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Seeded synthetic inputs for the benchmark suite"""
+import numpy as np
+import pandas as pd
+import os
+
+# Rows (months) per size for single-entity uploads
+ROW_SIZES = {'small': 60, 'medium': 240, 'large': 1200}
+# Entities per size for long-format batch uploads
+ENTITY_SIZES = {'small': 10, 'medium': 100, 'large': 1000}
+# Documents per size for RAG ingestion
+DOCUMENT_SIZES = {'small': 10, 'medium': 100, 'large': 1000}
+# Stored chunk embeddings per size for vector store benchmarks
+EMBEDDING_SIZES = {'small': 5000, 'medium': 50000, 'large': 500000}
+
+FINANCE_WORDS = [
+    'revenue', 'margin', 'inflation', 'interest', 'bond', 'equity', 'dividend',
+    'cash', 'flow', 'liquidity', 'credit', 'risk', 'portfolio', 'tax', 'yield',
+    'market', 'growth', 'capital', 'debt', 'forecast', 'earnings', 'valuation'
+]
+
+def financial_frame(rows, seed=0):
+    """Monthly data set with the columns /api/analyze requires"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(rows)
+    season = np.sin(2 * np.pi * t / 12)
+    return pd.DataFrame({
+        'Date': pd.date_range('2000-01-01', periods=rows, freq='MS').strftime('%Y-%m-%d'),
+        'Inflation_Rate': 2.5 + 0.3 * season + rng.normal(0, 0.2, rows),
+        'Interest_Rate': 4.0 + np.cumsum(rng.normal(0, 0.05, rows)),
+        'Revenue_Growth': 5.0 + 0.01 * t + season + rng.normal(0, 0.5, rows),
+        'Profit_Margin': 12.0 + 0.5 * season + rng.normal(0, 0.3, rows),
+        'Cash_Flow': 100 + 0.2 * t + np.cumsum(rng.normal(0, 1, rows))
+    })
+
+def financial_csv(rows, seed=0):
+    """financial_frame as CSV bytes"""
+    return financial_frame(rows, seed).to_csv(index=False).encode()
+
+def batch_frame(entities, rows=48, seed=0):
+    """Long-format data set: one financial_frame per entity stacked with an Entity column"""
+    frames = []
+    for i in range(entities):
+        frame = financial_frame(rows, seed + i)
+        frame.insert(1, 'Entity', f'unit_{i:05d}')
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+def write_documents(directory, count, words=800, seed=0):
+    """Write count text files of finance vocabulary; returns their paths"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        text = ' '.join(rng.choice(FINANCE_WORDS, size=words))
+        path = os.path.join(directory, f'doc_{i:05d}.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        paths.append(path)
+    return paths
+
+def questions(count, seed=0):
+    """Finance questions with some repeats, like real chat traffic"""
+    rng = np.random.default_rng(seed)
+    templates = [
+        'What is the outlook for {0} and {1}?',
+        'How does {0} affect {1}?',
+        'Explain {0} risk in a {1} portfolio',
+        'Should I worry about {0} when planning {1}?'
+    ]
+    out = []
+    for _ in range(count):
+        template = templates[rng.integers(len(templates))]
+        out.append(template.format(*rng.choice(FINANCE_WORDS[:8], size=2)))
+    return out
+
+def embeddings(count, dim=384, clusters=64, seed=0):
+    """Clustered unit vectors shaped like MiniLM chunk embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(clusters, size=count)] + 0.6 * rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)